@@ -0,0 +1 @@
+"""Benchmarks for HackMD Agent against an in-process fake HackMD API."""
@@ -0,0 +1,206 @@
+"""In-process fake of the HackMD API for benchmarks.
+
+Serves a synthetic note corpus through ``httpx.MockTransport`` so that
+``HackMDClient`` and everything built on it run unmodified, with configurable
+response latency and rate limit (429) injection.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+_TITLE_WORDS = [
+    "Project",
+    "Meeting",
+    "Plan",
+    "Weekly",
+    "Design",
+    "Review",
+    "API",
+    "Roadmap",
+    "Notes",
+    "Retro",
+]
+_CJK_WORDS = [
+    "會議",
+    "記錄",
+    "專案",
+    "規劃",
+    "週報",
+    "設計",
+    "筆記",
+    "討論",
+    "進度",
+    "待辦",
+]
+_CONTENT_WORDS = (
+    _TITLE_WORDS
+    + _CJK_WORDS
+    + [
+        "agent",
+        "search",
+        "index",
+        "cache",
+        "latency",
+        "token",
+        "hackmd",
+        "markdown",
+    ]
+)
+
+
+@dataclass
+class FakeServerStats:
+    """Request counters of the fake server."""
+
+    requests: int = 0
+    rate_limited: int = 0
+    not_modified: int = 0
+    bytes_sent: int = 0
+    by_route: dict[str, int] = field(default_factory=dict)
+
+
+class FakeHackMD:
+    """Synthetic HackMD API backed by an in-memory corpus.
+
+    Args:
+        note_count: Number of notes in the corpus.
+        content_words: Approximate number of words per note body.
+        latency: Seconds each response is delayed.
+        rate_limit_probability: Chance that a request is answered with 429.
+        retry_after: ``Retry-After`` value sent with injected 429s.
+        seed: Random seed for a reproducible corpus and 429 pattern.
+        etags: Send ``ETag`` headers on reads and answer matching
+            ``If-None-Match`` requests with 304.
+    """
+
+    BASE_URL = "https://api.hackmd.io/v1"
+
+    def __init__(
+        self,
+        note_count: int = 1000,
+        content_words: int = 300,
+        latency: float = 0.0,
+        rate_limit_probability: float = 0.0,
+        retry_after: float = 0.05,
+        seed: int = 0,
+        etags: bool = True,
+    ) -> None:
+        self.etags = etags
+        self.content_words = content_words
+        self.latency = latency
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.stats = FakeServerStats()
+        self._random = random.Random(seed)
+        self._next_id = 0
+        self._notes: dict[str, dict[str, Any]] = {}
+        # Bodies are generated lazily so large corpora stay cheap to create
+        self._contents: dict[str, str] = {}
+        for _ in range(note_count):
+            self._add_note(self._random_title(), None)
+
+    @property
+    def note_ids(self) -> list[str]:
+        return list(self._notes)
+
+    def transport(self) -> httpx.MockTransport:
+        """Return an httpx transport routed to this fake server."""
+        return httpx.MockTransport(self.handle)
+
+    def _random_title(self) -> str:
+        words = self._random.sample(_TITLE_WORDS, 2) + self._random.sample(
+            _CJK_WORDS, 2
+        )
+        return f"{' '.join(words)} {self._next_id}"
+
+    def _content(self, note_id: str) -> str:
+        content = self._contents.get(note_id)
+        if content is None:
+            rng = random.Random(note_id)
+            words = rng.choices(_CONTENT_WORDS, k=self.content_words)
+            title = self._notes[note_id]["title"]
+            content = f"# {title}\n\n" + " ".join(words)
+        return content
+
+    def _add_note(self, title: str, content: str | None) -> dict[str, Any]:
+        note_id = f"note-{self._next_id:06d}"
+        self._next_id += 1
+        now = int(time.time() * 1000)
+        self._notes[note_id] = {
+            "id": note_id,
+            "title": title,
+            "tags": ["benchmark"],
+            "createdAt": now,
+            "lastChangedAt": now,
+            "publishLink": f"https://hackmd.io/@bench/{note_id}",
+            "readPermission": "owner",
+            "writePermission": "owner",
+        }
+        if content is not None:
+            self._contents[note_id] = content
+        return self._notes[note_id]
+
+    def _json(
+        self, status: int, data: Any, request: httpx.Request | None = None
+    ) -> httpx.Response:
+        """Encode ``data``; with ``request``, honour ``If-None-Match``."""
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if request is not None and self.etags:
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            headers["ETag"] = etag
+            if request.headers.get("If-None-Match") == etag:
+                self.stats.not_modified += 1
+                return httpx.Response(304, headers={"ETag": etag})
+        self.stats.bytes_sent += len(body)
+        return httpx.Response(status, content=body, headers=headers)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Serve one API request."""
+        self.stats.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._random.random() < self.rate_limit_probability:
+            self.stats.rate_limited += 1
+            return httpx.Response(429, headers={"Retry-After": str(self.retry_after)})
+
+        path = request.url.path.removeprefix("/v1")
+        route = f"{request.method} {'/notes/:id' if path.count('/') > 1 else path}"
+        self.stats.by_route[route] = self.stats.by_route.get(route, 0) + 1
+
+        if path == "/notes" and request.method == "GET":
+            return self._json(200, list(self._notes.values()), request)
+        if path == "/notes" and request.method == "POST":
+            data = json.loads(request.content)
+            note = self._add_note(data.get("title", ""), data.get("content", ""))
+            return self._json(201, {**note, "content": self._content(note["id"])})
+
+        note_id = path.removeprefix("/notes/")
+        note = self._notes.get(note_id)
+        if note is None:
+            return self._json(404, {"error": "Note not found"})
+        if request.method == "GET":
+            return self._json(200, {**note, "content": self._content(note_id)}, request)
+        if request.method == "PATCH":
+            data = json.loads(request.content)
+            if "content" in data:
+                self._contents[note_id] = data["content"]
+            for key in ("readPermission", "writePermission"):
+                if key in data:
+                    note[key] = data[key]
+            note["lastChangedAt"] = max(
+                note["lastChangedAt"] + 1, int(time.time() * 1000)
+            )
+            return self._json(202, {**note, "content": self._content(note_id)})
+        if request.method == "DELETE":
+            del self._notes[note_id]
+            self._contents.pop(note_id, None)
+            return httpx.Response(204)
+        return self._json(405, {"error": "Method not allowed"})
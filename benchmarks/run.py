@@ -0,0 +1,366 @@
+"""Benchmark HackMD Agent against the in-process fake HackMD API.
+
+Runs ``HackMDClient``, the tools from ``create_hackmd_tools`` and the MCP
+server tool functions against ``FakeHackMD`` and reports p50/p99 latency,
+throughput, peak memory and response size per scenario.
+
+Usage:
+    python -m benchmarks.run --notes 1000 --latency 0.01
+    python -m benchmarks.run --notes 100000 --layers client --json out.json
+    python -m benchmarks.run --layers tools mcp --compact
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from hackmd_agent import mcp_server
+from hackmd_agent.cache import NoteListCache
+from hackmd_agent.hackmd_client import HackMDClient
+from hackmd_agent.search_index import ContentIndex, TitleIndex
+from hackmd_agent.tools import create_hackmd_tools
+
+from .fake_server import FakeHackMD
+
+LAYERS = ("client", "tools", "mcp")
+
+
+@dataclass
+class BenchResult:
+    """Measurements of one scenario."""
+
+    layer: str
+    scenario: str
+    iterations: int
+    p50_ms: float
+    p99_ms: float
+    throughput: float
+    peak_memory_mb: float
+    avg_response_bytes: float
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(
+    layer: str,
+    scenario: str,
+    op: Callable[[int], Awaitable[Any]],
+    iterations: int,
+    concurrency: int = 1,
+) -> BenchResult:
+    """Run ``op`` ``iterations`` times with up to ``concurrency`` in flight."""
+    samples: list[float] = []
+    sizes: list[int] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            result = await op(i)
+            samples.append(time.perf_counter() - start)
+            if isinstance(result, str):
+                sizes.append(len(result.encode("utf-8")))
+
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(iterations)))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+
+    return BenchResult(
+        layer=layer,
+        scenario=scenario,
+        iterations=iterations,
+        p50_ms=percentile(samples, 50) * 1000,
+        p99_ms=percentile(samples, 99) * 1000,
+        throughput=iterations / elapsed if elapsed else 0.0,
+        peak_memory_mb=peak / (1024 * 1024),
+        avg_response_bytes=sum(sizes) / len(sizes) if sizes else 0.0,
+    )
+
+
+def _mcp_fn(tool: Any) -> Callable[..., Awaitable[str]]:
+    """Return the coroutine function behind a registered MCP tool."""
+    return getattr(tool, "fn", tool)
+
+
+def _install_mcp_client(
+    client: HackMDClient, index_dir: Path, compact: bool = False
+) -> None:
+    """Point the MCP server module at the benchmark client with fresh caches."""
+    mcp_server._client = client
+    mcp_server._compact_responses = compact
+    mcp_server._content_index = ContentIndex(index_dir / "mcp-index.json")
+    mcp_server._title_index = TitleIndex()
+    mcp_server._notes_cache = NoteListCache(mcp_server._fetch_note_list)
+
+
+async def run_benchmarks(args: argparse.Namespace) -> list[BenchResult]:
+    """Run all scenarios of the selected layers."""
+    server = FakeHackMD(
+        note_count=args.notes,
+        content_words=args.content_words,
+        latency=args.latency,
+        rate_limit_probability=args.rate_limit_probability,
+        seed=args.seed,
+        etags=not args.no_etags,
+    )
+    rng = random.Random(args.seed)
+    note_ids = server.note_ids
+    n = args.iterations
+    content_n = args.content_iterations
+    concurrency = args.concurrency
+    results: list[BenchResult] = []
+
+    def random_id(_: int) -> str:
+        return rng.choice(note_ids)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = Path(tmp)
+        client = HackMDClient(
+            "bench-token",
+            base_url=FakeHackMD.BASE_URL,
+            base_delay=0.01,
+            rate_limit=args.rate_limit or None,
+            transport=server.transport(),
+        )
+
+        if "client" in args.layers:
+            results += [
+                await measure("client", "list", lambda i: client.get_note_list(), n),
+                await measure(
+                    "client",
+                    "read",
+                    lambda i: client.get_note(random_id(i)),
+                    n,
+                    concurrency,
+                ),
+                await measure(
+                    "client",
+                    "search_title",
+                    lambda i: client.search_notes("meeting"),
+                    n,
+                ),
+                await measure(
+                    "client",
+                    "search_content",
+                    lambda i: client.search_notes("latency", search_content=True),
+                    content_n,
+                ),
+                await measure(
+                    "client",
+                    "update",
+                    lambda i: client.update_note(random_id(i), f"# Updated {i}"),
+                    n,
+                    concurrency,
+                ),
+                # Only the first write is sent, the rest are skipped as no-ops
+                await measure(
+                    "client",
+                    "update_unchanged",
+                    lambda i: client.update_note(note_ids[0], "# Unchanged"),
+                    n,
+                ),
+            ]
+
+        if "tools" in args.layers:
+            tools = {
+                tool.name: tool.call
+                for tool in create_hackmd_tools(
+                    "bench-token",
+                    index_path=index_dir / "index.json",
+                    client=client,
+                    compact=args.compact,
+                )
+            }
+            results += await _run_tool_scenarios(
+                "tools",
+                list_notes=lambda i: tools["hackmd_list_notes"]({}),
+                read_note=lambda i: tools["hackmd_read_note"]({"noteId": random_id(i)}),
+                search=lambda kw, **kw_args: tools["hackmd_search_notes"](
+                    {
+                        "keyword": kw,
+                        "fuzzy": kw_args.get("fuzzy", False),
+                        "searchContent": kw_args.get("search_content", False),
+                    }
+                ),
+                create_note=lambda i: tools["hackmd_create_note"](
+                    {"title": f"Bench {i}", "content": f"# Bench {i}"}
+                ),
+                update_note=lambda i: tools["hackmd_update_note"](
+                    {"noteId": random_id(i), "content": f"# Updated {i}"}
+                ),
+                iterations=n,
+                content_iterations=content_n,
+                concurrency=concurrency,
+            )
+
+        if "mcp" in args.layers:
+            _install_mcp_client(client, index_dir, args.compact)
+            results += await _run_tool_scenarios(
+                "mcp",
+                list_notes=lambda i: _mcp_fn(mcp_server.hackmd_list_notes)(),
+                read_note=lambda i: _mcp_fn(mcp_server.hackmd_read_note)(random_id(i)),
+                search=lambda kw, **kw_args: _mcp_fn(mcp_server.hackmd_search_notes)(
+                    kw, **kw_args
+                ),
+                create_note=lambda i: _mcp_fn(mcp_server.hackmd_create_note)(
+                    f"Bench {i}", f"# Bench {i}"
+                ),
+                update_note=lambda i: _mcp_fn(mcp_server.hackmd_update_note)(
+                    random_id(i), f"# Updated {i}"
+                ),
+                iterations=n,
+                content_iterations=content_n,
+                concurrency=concurrency,
+            )
+
+        window = client.concurrency_limiter.stats()
+        await client.close()
+
+    print(
+        f"Fake server: {server.stats.requests} requests, "
+        f"{server.stats.rate_limited} rate limited, "
+        f"{server.stats.not_modified} not modified, "
+        f"{server.stats.bytes_sent / (1024 * 1024):.1f} MB sent"
+    )
+    print(
+        f"Adaptive concurrency: window {window.window} "
+        f"(max {window.max_window}, {window.increases} increases, "
+        f"{window.decreases} decreases)"
+    )
+    return results
+
+
+async def _run_tool_scenarios(
+    layer: str,
+    list_notes: Callable[[int], Awaitable[str]],
+    read_note: Callable[[int], Awaitable[str]],
+    search: Callable[..., Awaitable[str]],
+    create_note: Callable[[int], Awaitable[str]],
+    update_note: Callable[[int], Awaitable[str]],
+    iterations: int,
+    content_iterations: int,
+    concurrency: int,
+) -> list[BenchResult]:
+    return [
+        await measure(layer, "list", list_notes, iterations),
+        await measure(layer, "read", read_note, iterations, concurrency),
+        await measure(layer, "search_title", lambda i: search("meeting"), iterations),
+        await measure(
+            layer,
+            "search_fuzzy",
+            lambda i: search("meetng plan", fuzzy=True),
+            iterations,
+        ),
+        # The first content search builds the index, later ones reuse it
+        await measure(
+            layer,
+            "search_content_cold",
+            lambda i: search("latency", search_content=True),
+            1,
+        ),
+        await measure(
+            layer,
+            "search_content_warm",
+            lambda i: search("latency", search_content=True),
+            content_iterations,
+        ),
+        await measure(layer, "create", create_note, iterations, concurrency),
+        await measure(layer, "update", update_note, iterations, concurrency),
+    ]
+
+
+def print_table(results: list[BenchResult]) -> None:
+    """Print results as a fixed-width table."""
+    header = (
+        f"{'layer':<7} {'scenario':<20} {'n':>5} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'ops/s':>9} {'peak MB':>8} {'resp KB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.layer:<7} {r.scenario:<20} {r.iterations:>5} {r.p50_ms:>9.2f} "
+            f"{r.p99_ms:>9.2f} {r.throughput:>9.1f} {r.peak_memory_mb:>8.1f} "
+            f"{r.avg_response_bytes / 1024:>8.1f}"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--notes", type=int, default=1000, help="corpus size")
+    parser.add_argument(
+        "--content-words", type=int, default=300, help="words per note body"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added per response"
+    )
+    parser.add_argument(
+        "--rate-limit-probability",
+        type=float,
+        default=0.0,
+        help="chance of an injected 429 per request",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="client-side requests per second (0 disables)",
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--content-iterations",
+        type=int,
+        default=5,
+        help="iterations of warm content search scenarios",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="parallel read/write operations"
+    )
+    parser.add_argument(
+        "--no-etags",
+        action="store_true",
+        help="fake server sends no ETags (disables conditional requests)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="use compact tool result encoding in the tools and mcp layers",
+    )
+    parser.add_argument("--layers", nargs="+", choices=LAYERS, default=list(LAYERS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for ``python -m benchmarks.run``."""
+    args = parse_args(argv)
+    tracemalloc.start()
+    try:
+        results = asyncio.run(run_benchmarks(args))
+    finally:
+        tracemalloc.stop()
+    print_table(results)
+    if args.json:
+        args.json.write_text(
+            json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,35 @@
 """HackMD Agent - Tools for AI agents to manage HackMD notes."""
 
-from .agent import AgentConfig, ProcessResult, process_message, run_agent
+from .agent import (
+    Agent,
+    AgentConfig,
+    ProcessResult,
+    process_message,
+    run_agent,
+    stream_message,
+)
 from .tools import create_hackmd_tools
-from .types import Tool, execute_tool, to_anthropic_tools, to_gemini_tools
+from .types import (
+    Tool,
+    ToolRegistry,
+    ToolStats,
+    execute_tool,
+    to_anthropic_tools,
+    to_gemini_tools,
+)
 
 __all__ = [
     "create_hackmd_tools",
     "Tool",
+    "ToolRegistry",
+    "ToolStats",
     "execute_tool",
     "to_gemini_tools",
     "to_anthropic_tools",  # Backward compatibility
     "run_agent",
     "process_message",
+    "stream_message",
+    "Agent",
     "AgentConfig",
     "ProcessResult",
 ]
@@ -1,12 +1,15 @@
 """Agent logic for interactive and programmatic usage."""
 
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable, Sequence
 from dataclasses import dataclass, field
 from typing import Any
 
 from google import genai
 from google.genai import types
 
-from .types import Tool, execute_tool, to_gemini_tools
+from .types import Tool, ToolRegistry, as_registry, to_gemini_tools
 
 
 @dataclass
@@ -16,6 +19,8 @@ class AgentConfig:
     model: str = "gemini-2.5-flash"
     max_tokens: int = 4096
     system_prompt: str = "You are a helpful agent for managing HackMD notes."
+    # Maximum number of function calls from one model turn executed at once
+    max_concurrent_tools: int = 8
 
 
 @dataclass
@@ -27,7 +32,7 @@ class ProcessResult:
     tools_used: list[str] = field(default_factory=list)
 
 
-def _create_tools_config(tools: list[Tool]) -> list[types.Tool]:
+def _create_tools_config(tools: ToolRegistry | list[Tool]) -> list[types.Tool]:
     """Create Gemini tools configuration from Tool list."""
     function_declarations = []
     for tool_def in to_gemini_tools(tools):
@@ -41,98 +46,69 @@ def _create_tools_config(tools: list[Tool]) -> list[types.Tool]:
     return [types.Tool(function_declarations=function_declarations)]
 
 
-async def run_agent(
-    client: genai.Client,
-    tools: list[Tool],
-    config: AgentConfig | None = None,
-) -> None:
-    """
-    Run the HackMD agent in interactive CLI mode.
-    Press Ctrl+C to quit.
-    """
-    cfg = config or AgentConfig()
-    gemini_tools = _create_tools_config(tools)
-
-    # Create async chat session
-    chat = client.aio.chats.create(
-        model=cfg.model,
-        config=types.GenerateContentConfig(
-            system_instruction=cfg.system_prompt,
-            max_output_tokens=cfg.max_tokens,
-            tools=gemini_tools,
-            automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                disable=True  # We handle function calling manually
-            ),
-        ),
-    )
-
-    print("Chat with HackMD Agent (ctrl-c to quit)\n")
-
-    try:
-        while True:
-            try:
-                user_input = input("😂: ")
-            except EOFError:
-                break
-            if not user_input:
-                continue
-
-            # Send message and get response
-            response = await chat.send_message(user_input)
+async def _execute_function_calls(
+    tools: ToolRegistry,
+    function_calls: Sequence[types.FunctionCall],
+    max_concurrency: int,
+) -> list[types.Part]:
+    """Execute all function calls of a model turn concurrently.
 
-            # Process response - handle function calls manually
-            while True:
-                has_function_call = False
-
-                # Check for text response
-                if response.text:
-                    print(f"🤖: {response.text}")
-
-                # Check for function calls
-                if response.function_calls:
-                    has_function_call = True
-                    for fc in response.function_calls:
-                        print(f"🔧 Using: {fc.name}...")
-
-                        # Execute the tool
-                        result = await execute_tool(
-                            tools, fc.name, dict(fc.args) if fc.args else {}
-                        )
-
-                        # Send function response back
-                        function_response = types.Part.from_function_response(
-                            name=fc.name,
-                            response={"result": result},
-                        )
-                        response = await chat.send_message(function_response)
-                        break  # Process new response
-
-                if not has_function_call:
-                    break
+    Returns one function response part per call, in the order of the calls,
+    so they can be sent back to the model in a single message.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(fc: types.FunctionCall) -> types.Part:
+        name = fc.name or ""
+        async with semaphore:
+            result = await tools.execute(name, dict(fc.args) if fc.args else {})
+        return types.Part.from_function_response(
+            name=name,
+            response={"result": result},
+        )
 
-    except KeyboardInterrupt:
-        print("\nGoodbye!")
+    return list(await asyncio.gather(*(run(fc) for fc in function_calls)))
 
 
-async def process_message(
-    client: genai.Client,
-    tools: list[Tool],
-    user_message: str,
-    conversation: list[dict[str, Any]] | None = None,
-    config: AgentConfig | None = None,
-) -> ProcessResult:
+async def read_input(prompt: str = "") -> str:
     """
-    Process a single message programmatically.
+    Read a line from stdin without blocking the event loop.
 
-    Returns:
-        ProcessResult with response text, updated conversation, and tools used.
+    ``input()`` runs in a daemon thread, so an abandoned read (e.g. after
+    Ctrl+C) does not keep the interpreter from exiting. Raises ``EOFError``
+    at end of input like ``input()``.
     """
-    cfg = config or AgentConfig()
-    gemini_tools = _create_tools_config(tools)
-    tools_used: list[str] = []
-    response_text = ""
-
-    # Build history from conversation
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[str] = loop.create_future()
+
+    def deliver(result: str | None, error: Exception | None) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result or "")
+
+    def read() -> None:
+        line: str | None = None
+        error: Exception | None = None
+        try:
+            line = input(prompt)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(deliver, line, error)
+        except RuntimeError:
+            pass  # The loop was closed while waiting for input
+
+    threading.Thread(target=read, name="hackmd-agent-input", daemon=True).start()
+    return await future
+
+
+def _build_history(
+    conversation: list[dict[str, Any]] | None,
+) -> list[types.Content]:
+    """Build Gemini chat history from a conversation list."""
     history: list[types.Content] = []
     if conversation:
         for msg in conversation:
@@ -143,62 +119,256 @@ async def process_message(
                     parts=[types.Part.from_text(text=msg["content"])],
                 )
             )
+    return history
 
-    # Create async chat session with history
-    chat = client.aio.chats.create(
-        model=cfg.model,
-        history=history,
-        config=types.GenerateContentConfig(
-            system_instruction=cfg.system_prompt,
-            max_output_tokens=cfg.max_tokens,
-            tools=gemini_tools,
-            automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                disable=True
-            ),
-        ),
-    )
 
-    # Track conversation
-    conv = conversation.copy() if conversation else []
-    conv.append({"role": "user", "content": user_message})
+class Agent:
+    """
+    Reusable agent bound to a Gemini client and a tool list.
 
-    # Send initial message
-    response = await chat.send_message(user_message)
+    Tools are held in an immutable ToolRegistry. Tool declarations and the
+    generation config are compiled once and reused by every
+    ``process_message``/``run`` call. They are recompiled when ``tools`` is
+    reassigned or the relevant config fields change.
+    """
 
-    # Process until no more function calls
-    while True:
-        has_function_call = False
+    def __init__(
+        self,
+        client: genai.Client,
+        tools: ToolRegistry | list[Tool],
+        config: AgentConfig | None = None,
+    ) -> None:
+        self.client = client
+        self.config = config or AgentConfig()
+        self._tools = as_registry(tools)
+        self._compiled_key: tuple[Any, ...] | None = None
+        self._generate_config: types.GenerateContentConfig | None = None
+
+    @property
+    def tools(self) -> ToolRegistry:
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools: ToolRegistry | list[Tool]) -> None:
+        self._tools = as_registry(tools)
+        self._generate_config = None
+
+    def _cache_key(self) -> tuple[Any, ...]:
+        return (id(self._tools), self.config.system_prompt, self.config.max_tokens)
+
+    def generate_config(self) -> types.GenerateContentConfig:
+        """Return the compiled chat config, rebuilding it if stale."""
+        key = self._cache_key()
+        if self._generate_config is None or key != self._compiled_key:
+            self._generate_config = types.GenerateContentConfig(
+                system_instruction=self.config.system_prompt,
+                max_output_tokens=self.config.max_tokens,
+                tools=_create_tools_config(self._tools),
+                automatic_function_calling=types.AutomaticFunctionCallingConfig(
+                    disable=True  # We handle function calling manually
+                ),
+            )
+            self._compiled_key = key
+        return self._generate_config
+
+    async def run(self) -> None:
+        """
+        Run the HackMD agent in interactive CLI mode.
+        Responses are printed as they stream in. Press Ctrl+C to quit.
+        """
+        # Create async chat session
+        chat = self.client.aio.chats.create(
+            model=self.config.model,
+            config=self.generate_config(),
+        )
 
-        # Collect text response
-        if response.text:
-            response_text += response.text
+        print("Chat with HackMD Agent (ctrl-c to quit)\n")
 
-        # Check for function calls
-        if response.function_calls:
-            has_function_call = True
-            for fc in response.function_calls:
-                tools_used.append(fc.name)
+        in_reply = False
 
-                # Execute the tool
-                result = await execute_tool(
-                    tools, fc.name, dict(fc.args) if fc.args else {}
-                )
+        def on_tool_call(name: str) -> None:
+            nonlocal in_reply
+            if in_reply:
+                print()
+                in_reply = False
+            print(f"🔧 Using: {name}...")
 
-                # Send function response back
-                function_response = types.Part.from_function_response(
-                    name=fc.name,
-                    response={"result": result},
-                )
-                response = await chat.send_message(function_response)
-                break  # Process new response
+        try:
+            while True:
+                try:
+                    # Background tasks (cache refreshes, prefetching) keep
+                    # running while the user types
+                    user_input = await read_input("😂: ")
+                except EOFError:
+                    break
+                if not user_input:
+                    continue
+
+                async for text in self._stream_turn(chat, user_input, on_tool_call):
+                    if not in_reply:
+                        print("🤖: ", end="")
+                        in_reply = True
+                    print(text, end="", flush=True)
+                if in_reply:
+                    print()
+                    in_reply = False
+
+        except KeyboardInterrupt:
+            print("\nGoodbye!")
+
+    async def _stream_turn(
+        self,
+        chat: Any,
+        message: str,
+        on_tool_call: Callable[[str], None] | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream one user turn, executing function calls until the model is done."""
+        payload: str | list[types.Part] = message
+        while True:
+            function_calls: list[types.FunctionCall] = []
+            async for chunk in await chat.send_message_stream(payload):
+                # A chunk may carry both text and function calls
+                if chunk.text:
+                    yield chunk.text
+                if chunk.function_calls:
+                    function_calls.extend(chunk.function_calls)
+
+            if not function_calls:
+                return
+
+            if on_tool_call:
+                for fc in function_calls:
+                    on_tool_call(fc.name or "")
+
+            # Execute every call of this turn and send all results back
+            payload = await _execute_function_calls(
+                self._tools, function_calls, self.config.max_concurrent_tools
+            )
 
-        if not has_function_call:
-            break
+    async def stream_message(
+        self,
+        user_message: str,
+        conversation: list[dict[str, Any]] | None = None,
+        on_tool_call: Callable[[str], None] | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Process a single message, yielding response text chunks as they arrive.
+
+        Function calls are executed between chunks; ``on_tool_call`` is called
+        with the name of each tool before it runs.
+        """
+        chat = self.client.aio.chats.create(
+            model=self.config.model,
+            history=_build_history(conversation),
+            config=self.generate_config(),
+        )
+        async for text in self._stream_turn(chat, user_message, on_tool_call):
+            yield text
+
+    async def process_message(
+        self,
+        user_message: str,
+        conversation: list[dict[str, Any]] | None = None,
+    ) -> ProcessResult:
+        """
+        Process a single message programmatically.
+
+        Returns:
+            ProcessResult with response text, updated conversation, and tools used.
+        """
+        cfg = self.config
+        tools_used: list[str] = []
+        response_text = ""
+
+        # Create async chat session with history
+        chat = self.client.aio.chats.create(
+            model=cfg.model,
+            history=_build_history(conversation),
+            config=self.generate_config(),
+        )
 
-    conv.append({"role": "assistant", "content": response_text})
+        # Track conversation
+        conv = conversation.copy() if conversation else []
+        conv.append({"role": "user", "content": user_message})
 
-    return ProcessResult(
-        response=response_text,
-        conversation=conv,
-        tools_used=tools_used,
+        # Send initial message
+        response = await chat.send_message(user_message)
+
+        # Process until no more function calls
+        while True:
+            # Collect text response
+            if response.text:
+                response_text += response.text
+
+            # Check for function calls
+            if not response.function_calls:
+                break
+
+            tools_used.extend(fc.name or "" for fc in response.function_calls)
+
+            # Execute every call of this turn and send all results back
+            function_responses = await _execute_function_calls(
+                self._tools, response.function_calls, cfg.max_concurrent_tools
+            )
+            response = await chat.send_message(function_responses)
+
+        conv.append({"role": "assistant", "content": response_text})
+
+        return ProcessResult(
+            response=response_text,
+            conversation=conv,
+            tools_used=tools_used,
+        )
+
+
+async def run_agent(
+    client: genai.Client,
+    tools: ToolRegistry | list[Tool],
+    config: AgentConfig | None = None,
+) -> None:
+    """
+    Run the HackMD agent in interactive CLI mode.
+    Press Ctrl+C to quit.
+    """
+    await Agent(client, tools, config).run()
+
+
+async def process_message(
+    client: genai.Client,
+    tools: ToolRegistry | list[Tool],
+    user_message: str,
+    conversation: list[dict[str, Any]] | None = None,
+    config: AgentConfig | None = None,
+) -> ProcessResult:
+    """
+    Process a single message programmatically.
+
+    For repeated calls with the same tools, create an ``Agent`` once and call
+    ``Agent.process_message`` to reuse the compiled tool declarations.
+
+    Returns:
+        ProcessResult with response text, updated conversation, and tools used.
+    """
+    return await Agent(client, tools, config).process_message(
+        user_message, conversation
     )
+
+
+async def stream_message(
+    client: genai.Client,
+    tools: ToolRegistry | list[Tool],
+    user_message: str,
+    conversation: list[dict[str, Any]] | None = None,
+    config: AgentConfig | None = None,
+) -> AsyncIterator[str]:
+    """
+    Process a single message, yielding response text chunks as they arrive.
+
+    Example:
+        async for chunk in stream_message(client, tools, "Summarize my notes"):
+            print(chunk, end="", flush=True)
+    """
+    async for text in Agent(client, tools, config).stream_message(
+        user_message, conversation
+    ):
+        yield text
@@ -0,0 +1,565 @@
+"""Caches for HackMD API data."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .markdown import Heading, parse_headings
+from .rate_limit import CircuitOpenError
+
+if TYPE_CHECKING:
+    from .hackmd_client import RetryInfo
+
+    NoteListFetcher = Callable[
+        [RetryInfo | None, Callable[[str], None] | None],
+        Awaitable[list[dict[str, Any]]],
+    ]
+
+
+class NoteListCache:
+    """Stale-while-revalidate cache for the note list.
+
+    - Younger than ``soft_ttl``: served from cache.
+    - Between ``soft_ttl`` and ``hard_ttl``: served from cache while a single
+      background task refreshes it.
+    - Older than ``hard_ttl`` (or empty): callers wait for a refresh, sharing
+      one in-flight request.
+
+    While the API is unavailable (a refresh was rejected by an open circuit
+    breaker or answered with stale data), the list is served as is but every
+    caller gets ``retry_info.stale`` set, and the list's age is not reset.
+
+    The cached list is never mutated in place; updates replace it.
+    """
+
+    DEFAULT_SOFT_TTL = 60.0
+    DEFAULT_HARD_TTL = 600.0
+
+    def __init__(
+        self,
+        fetch: NoteListFetcher,
+        soft_ttl: float = DEFAULT_SOFT_TTL,
+        hard_ttl: float = DEFAULT_HARD_TTL,
+    ) -> None:
+        self._fetch = fetch
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max(hard_ttl, soft_ttl)
+        self._notes: list[dict[str, Any]] | None = None
+        self._fetched_at = 0.0
+        self._refresh_task: asyncio.Task[list[dict[str, Any]]] | None = None
+        # Incremented by invalidate() and writes so that refreshes started
+        # earlier are discarded
+        self._generation = 0
+        # Set while the last refresh could not reach the API
+        self._stale = False
+        self.last_error: Exception | None = None
+
+    @property
+    def age(self) -> float | None:
+        """Seconds since the list was fetched, or None if nothing is cached."""
+        if self._notes is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    async def get(
+        self,
+        retry_info: RetryInfo | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return the note list, refreshing it according to the TTLs."""
+        age = self.age
+        notes = self._notes
+        if notes is None or age is None or age >= self.hard_ttl:
+            task = self._start_refresh(retry_info, progress_callback)
+            try:
+                notes = await asyncio.shield(task)
+            except CircuitOpenError:
+                if self._notes is None:
+                    raise
+                notes = self._notes
+        elif age >= self.soft_ttl:
+            self._start_refresh(None, None)
+        if self._stale and retry_info is not None:
+            retry_info.stale = True
+        return notes
+
+    def invalidate(self) -> None:
+        """Drop the cached list so the next ``get()`` waits for a refresh."""
+        self._notes = None
+        self._refresh_task = None
+        self._generation += 1
+
+    def upsert(self, note: dict[str, Any]) -> None:
+        """Insert or update a note's metadata in the cached list.
+
+        Used after writes so the next read does not need a full refresh.
+        Does nothing when no list is cached.
+        """
+        self.patch(upserts=[note])
+
+    def remove(self, note_id: str) -> None:
+        """Remove a note from the cached list."""
+        self.patch(removed=[note_id])
+
+    def patch(
+        self,
+        upserts: Iterable[dict[str, Any]] = (),
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Apply many writes to the cached list in a single pass.
+
+        Notes in ``upserts`` are merged into existing entries or, if new,
+        prepended in the given order; IDs in ``removed`` are dropped.
+        """
+        if self._notes is None:
+            return
+        updates = {
+            note["id"]: {k: v for k, v in note.items() if k != "content"}
+            for note in upserts
+            if note.get("id")
+        }
+        removed_ids = set(removed)
+        if not updates and not removed_ids:
+            return
+        notes: list[dict[str, Any]] = []
+        for existing in self._notes:
+            note_id = existing.get("id")
+            if note_id in removed_ids:
+                continue
+            update = updates.pop(note_id, None) if note_id else None
+            notes.append({**existing, **update} if update else existing)
+        self._replace([*updates.values(), *notes])
+
+    def _replace(self, notes: list[dict[str, Any]]) -> None:
+        # Refreshes started before this write would overwrite it with older data
+        self._notes = notes
+        self._generation += 1
+
+    def _start_refresh(
+        self,
+        retry_info: RetryInfo | None,
+        progress_callback: Callable[[str], None] | None,
+    ) -> asyncio.Task[list[dict[str, Any]]]:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(
+                self._refresh(retry_info, progress_callback)
+            )
+            self._refresh_task.add_done_callback(_consume_exception)
+        return self._refresh_task
+
+    async def _refresh(
+        self,
+        retry_info: RetryInfo | None,
+        progress_callback: Callable[[str], None] | None,
+    ) -> list[dict[str, Any]]:
+        # Imported here because hackmd_client imports this module
+        from .hackmd_client import RetryInfo
+
+        if retry_info is None:
+            retry_info = RetryInfo()
+        generation = self._generation
+        try:
+            notes = await self._fetch(retry_info, progress_callback)
+        except Exception as e:
+            self.last_error = e
+            if isinstance(e, CircuitOpenError):
+                self._stale = True
+            raise
+        self.last_error = None
+        self._stale = retry_info.stale
+        if generation != self._generation:
+            return notes
+        if not retry_info.stale:
+            self._notes = notes
+            self._fetched_at = time.monotonic()
+        elif self._notes is None:
+            # Better than nothing, but due for a refresh on the next call
+            self._notes = notes
+            self._fetched_at = -math.inf
+        return notes
+
+
+def _consume_exception(task: asyncio.Task[Any]) -> None:
+    """Retrieve a refresh task's exception so unawaited failures are not logged."""
+    if not task.cancelled():
+        task.exception()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing content cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _ContentEntry:
+    note: dict[str, Any]
+    changed_at: Any
+    size: int
+    stored_at: float
+
+
+@dataclass
+class _Digest:
+    digest: bytes
+    changed_at: Any
+    permissions: tuple[str | None, str | None]
+    stored_at: float
+
+
+@dataclass
+class _Known:
+    changed_at: Any
+    seen_at: float
+
+
+def _is_older(changed_at: Any, than: Any) -> bool:
+    try:
+        return bool(changed_at < than)
+    except TypeError:
+        return False
+
+
+def content_digest(content: str) -> bytes:
+    """Hash of a note's content used to detect no-op updates."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+class NoteContentCache:
+    """LRU cache of full notes bounded by total size in bytes.
+
+    An entry is valid while its ``lastChangedAt`` equals the latest value
+    known for the note and either the entry or that value was seen within
+    ``ttl`` seconds. Known values come from the note list (``observe_list()``)
+    and from fetched notes, and are never replaced by older ones.
+
+    Independently of the LRU, a content digest and the permissions of every
+    note read or written are kept (validated the same way) so that updates
+    that would not change anything can be skipped.
+    """
+
+    DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+    DEFAULT_TTL = 60.0
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _ContentEntry] = OrderedDict()
+        self._known_changed_at: dict[str, _Known] = {}
+        self._digests: dict[str, _Digest] = {}
+        self._size = 0
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, note_id: object) -> bool:
+        return note_id in self._entries
+
+    def get(self, note_id: str) -> dict[str, Any] | None:
+        """Return a copy of the cached note, or None if missing or outdated.
+
+        Outdated notes stay cached until replaced, evicted or pruned by
+        ``observe_list()``, so ``get_stale()`` can still serve them.
+        """
+        entry = self._entries.get(note_id)
+        if entry is None or not self._is_valid(note_id, entry):
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(note_id)
+        self._stats.hits += 1
+        return dict(entry.note)
+
+    def get_stale(self, note_id: str) -> dict[str, Any] | None:
+        """Return a copy of the cached note even if it may be outdated."""
+        entry = self._entries.get(note_id)
+        return dict(entry.note) if entry is not None else None
+
+    def put(self, note: dict[str, Any]) -> None:
+        """Cache a full note, evicting least recently used notes if needed."""
+        note_id = note.get("id")
+        if not note_id or "content" not in note:
+            return
+        changed_at = note.get("lastChangedAt")
+        if changed_at is not None:
+            self._observe(note_id, changed_at, time.monotonic())
+        # Digests are kept even for notes too large to cache
+        self.remember_content(
+            note_id,
+            note["content"],
+            changed_at,
+            note.get("readPermission"),
+            note.get("writePermission"),
+        )
+        size = len(json.dumps(note, ensure_ascii=False).encode("utf-8"))
+        self._drop(note_id)
+        if size > self.max_bytes:
+            return
+        self._entries[note_id] = _ContentEntry(
+            note=dict(note),
+            changed_at=changed_at,
+            size=size,
+            stored_at=time.monotonic(),
+        )
+        self._size += size
+        while self._size > self.max_bytes:
+            evicted_id = next(iter(self._entries))
+            self._drop(evicted_id)
+            self._stats.evictions += 1
+
+    def invalidate(self, note_id: str) -> None:
+        """Forget a note, e.g. after it was updated or deleted."""
+        self._drop(note_id)
+        self._digests.pop(note_id, None)
+        self._known_changed_at.pop(note_id, None)
+
+    def remember_content(
+        self,
+        note_id: str,
+        content: str,
+        changed_at: Any = None,
+        read_permission: str | None = None,
+        write_permission: str | None = None,
+    ) -> None:
+        """Record the content digest and permissions of a note.
+
+        Permissions passed as None keep the previously recorded value.
+        """
+        previous = self._digests.get(note_id)
+        old_read, old_write = previous.permissions if previous else (None, None)
+        self._digests[note_id] = _Digest(
+            digest=content_digest(content),
+            changed_at=changed_at,
+            permissions=(read_permission or old_read, write_permission or old_write),
+            stored_at=time.monotonic(),
+        )
+
+    def is_unchanged(
+        self,
+        note_id: str,
+        content: str,
+        read_permission: str | None = None,
+        write_permission: str | None = None,
+        max_age: float | None = None,
+    ) -> bool:
+        """Return True if writing this content and permissions would be a no-op.
+
+        Permissions passed as None are not being changed. Returns False when
+        the note's current state is unknown or may be outdated, or, with
+        ``max_age``, was not confirmed by a read, write or list within that
+        many seconds.
+        """
+        recorded = self._digests.get(note_id)
+        if recorded is None or not self._is_valid(note_id, recorded, max_age):
+            return False
+        for requested, current in zip(
+            (read_permission, write_permission), recorded.permissions
+        ):
+            if requested is not None and requested != current:
+                return False
+        return recorded.digest == content_digest(content)
+
+    def observe_list(self, notes: Iterable[dict[str, Any]]) -> None:
+        """Record list metadata and drop entries that are now outdated."""
+        listed: dict[str, Any] = {}
+        for note in notes:
+            note_id = note.get("id")
+            if note_id:
+                listed[note_id] = note.get("lastChangedAt")
+        previous = self._known_changed_at
+        self._known_changed_at = {}
+        now = time.monotonic()
+        for note_id, changed_at in listed.items():
+            if note_id in previous:
+                self._known_changed_at[note_id] = previous[note_id]
+            if changed_at is not None:
+                self._observe(note_id, changed_at, now)
+        for note_id, entry in list(self._entries.items()):
+            if note_id not in listed or not self._is_valid(note_id, entry):
+                self._drop(note_id)
+        self._digests = {
+            note_id: digest
+            for note_id, digest in self._digests.items()
+            if note_id in listed and self._is_valid(note_id, digest)
+        }
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache statistics."""
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            entries=len(self._entries),
+            size_bytes=self._size,
+        )
+
+    def _observe(self, note_id: str, changed_at: Any, now: float) -> None:
+        known = self._known_changed_at.get(note_id)
+        # A list fetched before a write may report an older change time
+        if known is None or not _is_older(changed_at, known.changed_at):
+            self._known_changed_at[note_id] = _Known(changed_at, now)
+
+    def _is_valid(
+        self,
+        note_id: str,
+        entry: _ContentEntry | _Digest,
+        max_age: float | None = None,
+    ) -> bool:
+        checked_at = entry.stored_at
+        known = self._known_changed_at.get(note_id)
+        if known is not None:
+            if entry.changed_at != known.changed_at:
+                return False
+            checked_at = max(checked_at, known.seen_at)
+        ttl = self.ttl if max_age is None else min(self.ttl, max_age)
+        return time.monotonic() - checked_at < ttl
+
+    def _drop(self, note_id: str) -> None:
+        entry = self._entries.pop(note_id, None)
+        if entry is not None:
+            self._size -= entry.size
+
+
+class OutlineCache:
+    """LRU cache of parsed heading outlines keyed by note ID and change time.
+
+    Notes without ``lastChangedAt`` are keyed by their content digest instead.
+    """
+
+    DEFAULT_MAX_ENTRIES = 512
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Any, list[Heading]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, note: dict[str, Any]) -> list[Heading]:
+        """Return the headings of a full note, parsing it only when it changed."""
+        note_id = note.get("id", "")
+        content = note.get("content") or ""
+        version = note.get("lastChangedAt")
+        if version is None:
+            version = content_digest(content)
+        cached = self._entries.get(note_id)
+        if cached is not None and cached[0] == version:
+            self._entries.move_to_end(note_id)
+            return cached[1]
+        headings = parse_headings(content)
+        if note_id and self.max_entries > 0:
+            self._entries[note_id] = (version, headings)
+            self._entries.move_to_end(note_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return headings
+
+
+@dataclass
+class Validated:
+    """A GET response body with the validators needed to revalidate it."""
+
+    etag: str | None
+    last_modified: str | None
+    body: bytes
+    content_type: str | None = None
+
+    def request_headers(self) -> dict[str, str]:
+        """Headers that make a GET conditional on this response."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    """LRU store of GET responses that carry ``ETag`` or ``Last-Modified``.
+
+    Used for conditional requests: a 304 answer is served from the stored
+    body. Responses without validators are not stored, so servers that do
+    not send them simply get unconditional requests. Bounded by total body
+    size in bytes.
+    """
+
+    DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Validated] = OrderedDict()
+        self._size = 0
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Validated | None:
+        """Return the stored response for ``url``, if any."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def store(
+        self,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        body: bytes,
+        content_type: str | None = None,
+    ) -> None:
+        """Remember a response, or forget ``url`` if it has no validators."""
+        self.invalidate(url)
+        if not (etag or last_modified) or len(body) > self.max_bytes:
+            return
+        self._entries[url] = Validated(etag, last_modified, body, content_type)
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+            self._stats.evictions += 1
+
+    def record(self, not_modified: bool) -> None:
+        """Count the outcome of a conditional request."""
+        if not_modified:
+            self._stats.hits += 1
+        else:
+            self._stats.misses += 1
+
+    def invalidate(self, url: str) -> None:
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot: hits are 304s, misses are changed responses."""
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            entries=len(self._entries),
+            size_bytes=self._size,
+        )
@@ -8,6 +8,7 @@ import sys
 from google import genai
 
 from .agent import run_agent
+from .hackmd_client import HackMDClient
 from .tools import create_hackmd_tools
 
 
@@ -28,9 +29,16 @@ async def async_main() -> None:
     # Create Gemini client
     client = genai.Client(api_key=api_key)
 
-    tools = create_hackmd_tools(api_token)
+    hackmd = HackMDClient(api_token, http2=os.environ.get("HACKMD_HTTP2") == "1")
+    tools = create_hackmd_tools(api_token, client=hackmd)
 
-    await run_agent(client, tools)
+    # Connect while the user types the first message
+    warm_up = asyncio.create_task(hackmd.warm_up())
+    try:
+        await run_agent(client, tools)
+    finally:
+        warm_up.cancel()
+        await hackmd.close()
 
 
 def main() -> None:
@@ -1,12 +1,28 @@
 """HackMD API client for Python."""
 
 import asyncio
-from collections.abc import Callable
+import importlib.util
+import warnings
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
 from dataclasses import dataclass
-from typing import Any, Literal
+from typing import Any, Literal, TypeVar
 
 import httpx
 
+from .cache import NoteContentCache, Validated, ValidatorCache
+from .rate_limit import (
+    AdaptiveConcurrency,
+    CircuitBreaker,
+    CircuitOpenError,
+    TokenBucket,
+)
+
+# A GET response and whether it is a stored body served while the API is down
+_GetResult = tuple[httpx.Response, bool]
+
+_Item = TypeVar("_Item")
+_Result = TypeVar("_Result")
+
 
 @dataclass
 class RetryInfo:
@@ -16,6 +32,10 @@ class RetryInfo:
     total_attempts: int = 1
     last_wait_seconds: float = 0.0
     final_wait_total: float = 0.0
+    # Set when the call was answered without a request, e.g. a no-op update
+    skipped: bool = False
+    # Set when cached data was returned because the API is unavailable
+    stale: bool = False
 
 
 class HackMDClient:
@@ -24,6 +44,17 @@ class HackMDClient:
     DEFAULT_MAX_RETRIES = 3
     DEFAULT_BASE_DELAY = 1.0
     DEFAULT_MAX_DELAY = 32.0
+    DEFAULT_MAX_CONCURRENCY = 16
+    DEFAULT_RATE_LIMIT = 5.0
+    DEFAULT_RATE_LIMIT_BURST = 10
+    DEFAULT_CONTENT_CACHE_BYTES = NoteContentCache.DEFAULT_MAX_BYTES
+    DEFAULT_VALIDATOR_CACHE_BYTES = ValidatorCache.DEFAULT_MAX_BYTES
+    DEFAULT_KEEPALIVE_EXPIRY = 30.0
+    DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+    DEFAULT_CIRCUIT_RESET_TIMEOUT = 30.0
+    # Seconds a recorded note state is trusted to skip a no-op update
+    # without re-reading the note first
+    NO_OP_MAX_AGE = 5.0
 
     def __init__(
         self,
@@ -32,7 +63,51 @@ class HackMDClient:
         max_retries: int = DEFAULT_MAX_RETRIES,
         base_delay: float = DEFAULT_BASE_DELAY,
         max_delay: float = DEFAULT_MAX_DELAY,
+        rate_limit: float | None = DEFAULT_RATE_LIMIT,
+        rate_limit_burst: int = DEFAULT_RATE_LIMIT_BURST,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        content_cache_bytes: int = DEFAULT_CONTENT_CACHE_BYTES,
+        validator_cache_bytes: int = DEFAULT_VALIDATOR_CACHE_BYTES,
+        http2: bool = False,
+        max_connections: int | None = None,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        circuit_failure_threshold: int = DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+        circuit_reset_timeout: float = DEFAULT_CIRCUIT_RESET_TIMEOUT,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
+        """Create a client.
+
+        Args:
+            api_token: HackMD API token.
+            base_url: API base URL.
+            max_retries: Retries for 429, 5xx and connection errors.
+            base_delay: Initial exponential backoff delay in seconds.
+            max_delay: Maximum backoff delay in seconds.
+            rate_limit: Requests per second allowed by the client-side limiter
+                (None disables proactive limiting).
+            rate_limit_burst: Requests that may be sent back-to-back.
+            max_concurrency: Upper bound of the adaptive limit on requests in
+                flight. The limit starts lower, grows while responses are
+                fast and healthy and halves on 429/5xx.
+            content_cache_bytes: Size budget of the note content cache
+                (0 disables caching).
+            validator_cache_bytes: Size budget of stored GET responses used
+                for ETag / Last-Modified revalidation (0 disables
+                conditional requests).
+            http2: Multiplex requests over HTTP/2 connections. Needs the
+                ``http2`` extra (``h2``); without it a warning is issued and
+                HTTP/1.1 is used.
+            max_connections: Connection pool size (default: ``max_concurrency``,
+                so requests admitted by the adaptive limit never queue for a
+                connection). Idle connections are kept up to the same number.
+            keepalive_expiry: Seconds an idle connection is kept open.
+            circuit_failure_threshold: Consecutive 5xx answers or connection
+                errors after which reads (or writes) fail fast with
+                ``CircuitOpenError`` instead of retrying (0 disables).
+            circuit_reset_timeout: Seconds an open circuit waits before
+                letting one probe request through.
+            transport: Optional httpx transport (e.g. a mock for tests).
+        """
         self.base_url = base_url
         self.max_retries = max_retries
         self.base_delay = base_delay
@@ -41,11 +116,76 @@ class HackMDClient:
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json",
         }
+        if http2 and importlib.util.find_spec("h2") is None:
+            warnings.warn(
+                "HTTP/2 requested but 'h2' is not installed "
+                "(pip install 'hackmd-agent[http2]'); using HTTP/1.1",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            http2 = False
+        self.http2 = http2
+        pool_size = max_connections or max_concurrency
         self._client = httpx.AsyncClient(
             base_url=base_url,
             headers=self.headers,
             timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            transport=transport,
+        )
+        # Shared by every request so concurrent callers stay under the quota
+        self.rate_limiter = TokenBucket(
+            rate_limit,
+            rate_limit_burst,
+            max_window=max_delay * 10,
+            max_pause=max_delay,
         )
+        self.concurrency_limiter = AdaptiveConcurrency(
+            initial=min(4, max_concurrency), max_limit=max_concurrency
+        )
+        self.content_cache = NoteContentCache(max_bytes=content_cache_bytes)
+        self.validator_cache = ValidatorCache(max_bytes=validator_cache_bytes)
+        # In-flight GETs by URL; concurrent identical GETs share one request
+        self._pending_gets: dict[str, asyncio.Task[_GetResult]] = {}
+        self.coalesced_requests = 0
+        # Write counter and the counter value of each note's last write, so
+        # GETs that started before a write do not cache what they read
+        self._writes = 0
+        self._last_write: dict[str, int] = {}
+        # Reads and writes fail independently, so cached reads keep working
+        # while writes are rejected and the other way round
+        self.circuit_breakers = {
+            name: CircuitBreaker(name, circuit_failure_threshold, circuit_reset_timeout)
+            for name in ("read", "write")
+        }
+
+    async def warm_up(self, connections: int = 1) -> int:
+        """Open connections before the first real request needs them.
+
+        Sends ``connections`` concurrent HEAD requests to the API base URL so
+        DNS, TCP and TLS setup happen ahead of time. With HTTP/2 a single
+        connection carries all requests, so one is enough. The requests
+        carry no API token, so they are not counted against the quota, and
+        bypass the rate limiter. Failures are ignored; returns the number of
+        requests that got any response.
+        """
+
+        async def ping() -> bool:
+            request = self._client.build_request("HEAD", "/")
+            del request.headers["Authorization"]
+            try:
+                await self._client.send(request)
+            except httpx.HTTPError:
+                return False
+            return True
+
+        results = await asyncio.gather(*(ping() for _ in range(max(1, connections))))
+        return sum(results)
 
     async def close(self) -> None:
         """Close the HTTP client."""
@@ -79,9 +219,14 @@ class HackMDClient:
 
         Raises:
             httpx.HTTPStatusError: After all retries exhausted
+            QuotaExhaustedError: When the quota resets after more than
+                ``max_delay`` seconds
+            CircuitOpenError: While the endpoint class keeps failing; raised
+                before sending, or instead of waiting for the next retry
         """
         if retry_info is None:
             retry_info = RetryInfo()
+        breaker = self.circuit_breakers["read" if method == "GET" else "write"]
 
         async def wait(seconds: float, reason: str = "") -> None:
             retry_info.last_wait_seconds = seconds
@@ -99,7 +244,36 @@ class HackMDClient:
 
         for attempt in range(self.max_retries + 1):
             try:
-                response = await self._client.request(method, url, **kwargs)
+                breaker.before_request()
+            except CircuitOpenError as e:
+                raise e from last_exception
+            try:
+                try:
+                    await self.rate_limiter.acquire()
+                    started = await self.concurrency_limiter.acquire()
+                except BaseException:
+                    breaker.cancel()
+                    raise
+                try:
+                    response = await self._client.request(method, url, **kwargs)
+                except httpx.RequestError:
+                    self.concurrency_limiter.release(started, overloaded=True)
+                    breaker.record_failure()
+                    raise
+                except BaseException:
+                    self.concurrency_limiter.cancel()
+                    breaker.cancel()
+                    raise
+                self.concurrency_limiter.release(
+                    started,
+                    overloaded=response.status_code == 429
+                    or response.status_code >= 500,
+                )
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                self.rate_limiter.update_from_headers(response.headers)
 
                 if response.status_code == 429:
                     retry_info.attempted = True
@@ -112,7 +286,11 @@ class HackMDClient:
                             pass
 
                     if attempt < self.max_retries:
-                        delay = await calc_delay(attempt, retry_after_val)
+                        # Rate limits apply to the whole token, so every
+                        # concurrent caller waits for the same deadline
+                        delay = self.rate_limiter.pause(
+                            await calc_delay(attempt, retry_after_val)
+                        )
                         retry_info.total_attempts = attempt + 2
                         await wait(delay, f"attempt {attempt + 1}/{self.max_retries}")
                         continue
@@ -121,7 +299,8 @@ class HackMDClient:
 
                 if response.status_code >= 500:
                     retry_info.attempted = True
-                    if attempt < self.max_retries:
+                    # An open circuit rejects the next attempt without waiting
+                    if attempt < self.max_retries and breaker.state == "closed":
                         delay = await calc_delay(attempt, None)
                         retry_info.total_attempts = attempt + 2
                         await wait(
@@ -131,6 +310,10 @@ class HackMDClient:
                         )
                         continue
 
+                # Answer to a conditional request, handled by the caller
+                if response.status_code == 304:
+                    return response
+
                 response.raise_for_status()
                 return response
 
@@ -142,7 +325,7 @@ class HackMDClient:
             except httpx.RequestError as e:
                 last_exception = e
                 retry_info.attempted = True
-                if attempt < self.max_retries:
+                if attempt < self.max_retries and breaker.state == "closed":
                     delay = await calc_delay(attempt, None)
                     retry_info.total_attempts = attempt + 2
                     await wait(
@@ -160,19 +343,116 @@ class HackMDClient:
             response=httpx.Response(500),
         )
 
+    async def _get(
+        self,
+        url: str,
+        retry_info: RetryInfo | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> _GetResult:
+        """GET ``url``, joining an identical request already in flight.
+
+        Callers that join share the first caller's response; retries and
+        progress are reported to the first caller only. Returns the response
+        and whether it is stale; stale results set ``retry_info.stale`` for
+        every caller and must not be cached.
+        """
+        task = self._pending_gets.get(url)
+        if task is None:
+            task = asyncio.create_task(
+                self._conditional_get(url, retry_info, progress_callback)
+            )
+            self._pending_gets[url] = task
+            task.add_done_callback(lambda t: self._finish_get(url, t))
+        else:
+            self.coalesced_requests += 1
+        # Cancelling one caller must not cancel the request for the others
+        response, stale = await asyncio.shield(task)
+        if stale and retry_info is not None:
+            retry_info.stale = True
+        return response, stale
+
+    async def _conditional_get(
+        self,
+        url: str,
+        retry_info: RetryInfo | None,
+        progress_callback: Callable[[str], None] | None,
+    ) -> _GetResult:
+        """GET ``url``, revalidating a stored response with its validators.
+
+        A 304 answer is turned into a 200 response with the stored body. The
+        stored body is also returned, marked stale, while the read circuit is
+        open.
+        """
+        stored = self.validator_cache.get(url)
+        try:
+            response = await self._request_with_retry(
+                "GET",
+                url,
+                retry_info=retry_info,
+                progress_callback=progress_callback,
+                headers=stored.request_headers() if stored else None,
+            )
+        except CircuitOpenError:
+            if stored is None:
+                raise
+            return _stored_response(stored, httpx.Request("GET", url)), True
+        if stored is not None:
+            self.validator_cache.record(response.status_code == 304)
+        if response.status_code == 304 and stored is not None:
+            return _stored_response(stored, response.request), False
+        self.validator_cache.store(
+            url,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            response.content,
+            response.headers.get("Content-Type"),
+        )
+        return response, False
+
+    def _detach_gets(self, note_id: str | None) -> None:
+        """Stop sharing GETs that started before a write to ``note_id``.
+
+        Their results are still returned to the callers that are waiting,
+        but no longer cached (see ``_written_since()``).
+        """
+        self._writes += 1
+        self._pending_gets.pop("/notes", None)
+        if note_id:
+            self._last_write[note_id] = self._writes
+            self._pending_gets.pop(f"/notes/{note_id}", None)
+
+    def _written_since(self, generation: int, note_id: str | None = None) -> bool:
+        """Whether ``note_id`` (or any note) was written after ``generation``."""
+        if note_id is None:
+            return self._writes > generation
+        return self._last_write.get(note_id, 0) > generation
+
+    def _finish_get(self, url: str, task: asyncio.Task[_GetResult]) -> None:
+        if self._pending_gets.get(url) is task:
+            del self._pending_gets[url]
+        # Retrieve the exception in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
     async def get_note_list(
         self,
         retry_info: RetryInfo | None = None,
         progress_callback: Callable[[str], None] | None = None,
     ) -> list[dict[str, Any]]:
-        """Get all notes for the authenticated user."""
-        response = await self._request_with_retry(
-            "GET",
+        """Get all notes for the authenticated user.
+
+        Concurrent calls share one request.
+        """
+        generation = self._writes
+        response, stale = await self._get(
             "/notes",
             retry_info=retry_info,
             progress_callback=progress_callback,
         )
-        return response.json()
+        notes: list[dict[str, Any]] = response.json()
+        if not stale and not self._written_since(generation):
+            self.content_cache.observe_list(notes)
+        return notes
 
     async def get_note(
         self,
@@ -180,14 +460,42 @@ class HackMDClient:
         retry_info: RetryInfo | None = None,
         progress_callback: Callable[[str], None] | None = None,
     ) -> dict[str, Any]:
-        """Get a specific note by ID."""
-        response = await self._request_with_retry(
-            "GET",
-            f"/notes/{note_id}",
-            retry_info=retry_info,
-            progress_callback=progress_callback,
-        )
-        return response.json()
+        """Get a specific note by ID, served from the content cache if valid.
+
+        Concurrent cache misses for the same note share one request. While the
+        API is unavailable (circuit open) an outdated copy is returned if there
+        is one, with ``retry_info.stale`` set; it is not cached as fresh.
+        """
+        cached = self.content_cache.get(note_id)
+        if cached is not None:
+            return cached
+        return await self._fetch_note(note_id, retry_info, progress_callback)
+
+    async def _fetch_note(
+        self,
+        note_id: str,
+        retry_info: RetryInfo | None,
+        progress_callback: Callable[[str], None] | None,
+    ) -> dict[str, Any]:
+        """Fetch a note, bypassing the content cache but updating it."""
+        generation = self._writes
+        try:
+            response, stale = await self._get(
+                f"/notes/{note_id}",
+                retry_info=retry_info,
+                progress_callback=progress_callback,
+            )
+        except CircuitOpenError:
+            outdated = self.content_cache.get_stale(note_id)
+            if outdated is None:
+                raise
+            if retry_info is not None:
+                retry_info.stale = True
+            return outdated
+        note: dict[str, Any] = response.json()
+        if not stale and not self._written_since(generation, note_id):
+            self.content_cache.put(note)
+        return note
 
     async def create_note(
         self,
@@ -212,7 +520,19 @@ class HackMDClient:
             retry_info=retry_info,
             progress_callback=progress_callback,
         )
-        return response.json()
+        note: dict[str, Any] = response.json()
+        self._detach_gets(note.get("id"))
+        if "content" in note:
+            self.content_cache.put(note)
+        elif note.get("id"):
+            self.content_cache.remember_content(
+                note["id"],
+                content,
+                note.get("lastChangedAt"),
+                note.get("readPermission", read_permission),
+                note.get("writePermission", write_permission),
+            )
+        return note
 
     async def update_note(
         self,
@@ -223,7 +543,26 @@ class HackMDClient:
         retry_info: RetryInfo | None = None,
         progress_callback: Callable[[str], None] | None = None,
     ) -> dict[str, Any]:
-        """Update an existing note."""
+        """Update an existing note.
+
+        If the content and permissions equal the note's current state, no
+        update is sent; ``retry_info.skipped`` is set and only ``{"id": ...}``
+        is returned. See ``_is_no_op()``.
+        """
+        if await self._is_no_op(
+            note_id,
+            content,
+            read_permission,
+            write_permission,
+            retry_info,
+            progress_callback,
+        ):
+            if retry_info is not None:
+                retry_info.skipped = True
+            if progress_callback:
+                progress_callback(f"Note {note_id} unchanged, update skipped")
+            return {"id": note_id}
+
         data: dict[str, Any] = {"content": content}
         if read_permission:
             data["readPermission"] = read_permission
@@ -237,7 +576,58 @@ class HackMDClient:
             retry_info=retry_info,
             progress_callback=progress_callback,
         )
-        return response.json()
+        note: dict[str, Any] = response.json()
+        self._detach_gets(note_id)
+        self.content_cache.invalidate(note_id)
+        self.content_cache.remember_content(
+            note_id,
+            content,
+            note.get("lastChangedAt") if isinstance(note, dict) else None,
+            read_permission,
+            write_permission,
+        )
+        return note
+
+    async def _is_no_op(
+        self,
+        note_id: str,
+        content: str,
+        read_permission: str | None,
+        write_permission: str | None,
+        retry_info: RetryInfo | None,
+        progress_callback: Callable[[str], None] | None,
+    ) -> bool:
+        """Check whether an update would leave the note as it is.
+
+        A recorded state confirmed within ``NO_OP_MAX_AGE`` seconds is
+        trusted. An older one may predate an edit made elsewhere, so the note
+        is re-read first (a 304 when the server sends an ETag); only a match
+        against that fresh copy counts.
+        """
+        cache = self.content_cache
+        if not cache.is_unchanged(note_id, content, read_permission, write_permission):
+            return False
+        if cache.is_unchanged(
+            note_id,
+            content,
+            read_permission,
+            write_permission,
+            max_age=self.NO_OP_MAX_AGE,
+        ):
+            return True
+        check = RetryInfo()
+        try:
+            await self._fetch_note(note_id, check, progress_callback)
+        except CircuitOpenError:
+            return False
+        finally:
+            if retry_info is not None:
+                retry_info.attempted |= check.attempted
+                retry_info.final_wait_total += check.final_wait_total
+        # A stale fallback is not cached and confirms nothing
+        if check.stale:
+            return False
+        return cache.is_unchanged(note_id, content, read_permission, write_permission)
 
     async def delete_note(
         self,
@@ -252,6 +642,9 @@ class HackMDClient:
             retry_info=retry_info,
             progress_callback=progress_callback,
         )
+        self._detach_gets(note_id)
+        self.content_cache.invalidate(note_id)
+        self.validator_cache.invalidate(f"/notes/{note_id}")
 
     async def search_notes(
         self,
@@ -284,28 +677,199 @@ class HackMDClient:
             ]
             return filtered, retry_info
 
-        filtered = []
-        total = len(notes)
+        matches: list[tuple[int, dict[str, Any]]] = []
+        pending: dict[str, int] = {}
         for i, note in enumerate(notes):
-            title_match = note.get("title", "").lower().find(keyword_lower) != -1
-            if title_match:
-                filtered.append(note)
+            if note.get("title", "").lower().find(keyword_lower) != -1:
+                matches.append((i, note))
+            else:
+                pending[note.get("id", "")] = i
+
+        total = len(pending)
+        checked = 0
+        async for note_id, full_note in self.get_notes_bulk(
+            pending,
+            retry_info=retry_info,
+            progress_callback=progress_callback,
+        ):
+            checked += 1
+            if progress_callback and checked % 5 == 0:
+                progress_callback(
+                    f"Searching content... {checked}/{total} notes checked"
+                )
+            if isinstance(full_note, Exception):
                 continue
+            if full_note.get("content", "").lower().find(keyword_lower) != -1:
+                index = pending[note_id]
+                matches.append((index, notes[index]))
 
-            if progress_callback and i % 5 == 0:
-                progress_callback(f"Searching content... {i + 1}/{total} notes checked")
+        matches.sort(key=lambda x: x[0])
+        return [note for _, note in matches], retry_info
 
-            try:
-                note_retry = RetryInfo()
-                full_note = await self.get_note(
-                    note.get("id", ""),
-                    retry_info=note_retry,
-                    progress_callback=progress_callback,
-                )
-                retry_info.final_wait_total += note_retry.final_wait_total
-                if full_note.get("content", "").lower().find(keyword_lower) != -1:
-                    filtered.append(note)
-            except Exception:
-                continue
+    async def get_notes_bulk(
+        self,
+        note_ids: Iterable[str],
+        concurrency: int | None = None,
+        retry_info: RetryInfo | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> AsyncIterator[tuple[str, dict[str, Any] | Exception]]:
+        """Fetch many notes concurrently, yielding them as they complete.
+
+        Requests are pipelined over the shared HTTP client by at most
+        ``concurrency`` workers. Rate limit backoff is shared by all workers.
+
+        Args:
+            note_ids: IDs of the notes to fetch.
+            concurrency: Maximum number of requests in flight (default: the
+                client's ``max_concurrency``; the adaptive limit applies too).
+            retry_info: Optional RetryInfo aggregating retries of all requests.
+            progress_callback: Callback to report progress to AI agent.
 
-        return filtered, retry_info
+        Yields:
+            Tuples of (note ID, note dict) in completion order. Failed fetches
+            yield the raised exception instead of the note.
+        """
+
+        async def fetch(note_id: str, note_retry: RetryInfo) -> dict[str, Any]:
+            return await self.get_note(
+                note_id, retry_info=note_retry, progress_callback=progress_callback
+            )
+
+        async for item in self._run_bulk(note_ids, fetch, concurrency, retry_info):
+            yield item
+
+    async def create_notes_bulk(
+        self,
+        notes: Iterable[dict[str, Any]],
+        concurrency: int | None = None,
+        retry_info: RetryInfo | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> AsyncIterator[tuple[int, dict[str, Any] | Exception]]:
+        """Create many notes concurrently, yielding them as they complete.
+
+        Each item holds the keyword arguments of ``create_note()`` (``title``,
+        ``content`` and optionally ``read_permission``/``write_permission``).
+
+        Yields:
+            Tuples of (position in ``notes``, created note or raised exception).
+        """
+
+        async def create(
+            item: tuple[int, dict[str, Any]], note_retry: RetryInfo
+        ) -> dict[str, Any]:
+            return await self.create_note(
+                **item[1], retry_info=note_retry, progress_callback=progress_callback
+            )
+
+        async for (index, _), result in self._run_bulk(
+            enumerate(notes), create, concurrency, retry_info
+        ):
+            yield index, result
+
+    async def update_notes_bulk(
+        self,
+        updates: Iterable[dict[str, Any]],
+        concurrency: int | None = None,
+        retry_info: RetryInfo | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> AsyncIterator[tuple[str, dict[str, Any] | Exception]]:
+        """Update many notes concurrently, yielding them as they complete.
+
+        Each item holds the keyword arguments of ``update_note()`` (``note_id``,
+        ``content`` and optionally ``read_permission``/``write_permission``).
+        Updates skipped as no-ops come back as ``{"id": ..., "skipped": True}``.
+
+        Yields:
+            Tuples of (note ID, updated note or raised exception).
+        """
+
+        async def update(item: dict[str, Any], note_retry: RetryInfo) -> dict[str, Any]:
+            note = await self.update_note(
+                **item, retry_info=note_retry, progress_callback=progress_callback
+            )
+            return {**note, "skipped": True} if note_retry.skipped else note
+
+        async for item, result in self._run_bulk(
+            updates, update, concurrency, retry_info
+        ):
+            yield item["note_id"], result
+
+    async def delete_notes_bulk(
+        self,
+        note_ids: Iterable[str],
+        concurrency: int | None = None,
+        retry_info: RetryInfo | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> AsyncIterator[tuple[str, None | Exception]]:
+        """Delete many notes concurrently, yielding each ID as it completes.
+
+        Yields:
+            Tuples of (note ID, None or raised exception).
+        """
+
+        async def delete(note_id: str, note_retry: RetryInfo) -> None:
+            await self.delete_note(
+                note_id, retry_info=note_retry, progress_callback=progress_callback
+            )
+
+        async for result in self._run_bulk(note_ids, delete, concurrency, retry_info):
+            yield result
+
+    async def _run_bulk(
+        self,
+        items: Iterable[_Item],
+        call: Callable[[_Item, RetryInfo], Awaitable[_Result]],
+        concurrency: int | None,
+        retry_info: RetryInfo | None,
+    ) -> AsyncIterator[tuple[_Item, _Result | Exception]]:
+        """Run ``call`` for each item with at most ``concurrency`` in flight.
+
+        All calls go through ``_request_with_retry`` and therefore share the
+        client's rate limiter, adaptive concurrency limit and 429 backoff, so
+        the effective parallelism follows what the server sustains. Results
+        are yielded in completion order; retries are aggregated into
+        ``retry_info``.
+        """
+        queue: asyncio.Queue[_Item] = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        if queue.empty():
+            return
+
+        results: asyncio.Queue[tuple[_Item, _Result | Exception]] = asyncio.Queue()
+
+        async def worker() -> None:
+            while not queue.empty():
+                item = queue.get_nowait()
+                item_retry = RetryInfo()
+                result: _Result | Exception
+                try:
+                    result = await call(item, item_retry)
+                except Exception as e:
+                    result = e
+                if retry_info is not None:
+                    retry_info.attempted |= item_retry.attempted
+                    retry_info.final_wait_total += item_retry.final_wait_total
+                    retry_info.stale |= item_retry.stale
+                await results.put((item, result))
+
+        if concurrency is None:
+            concurrency = self.concurrency_limiter.max_limit
+        total = queue.qsize()
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(max(1, min(concurrency, total)))
+        ]
+        try:
+            for _ in range(total):
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+def _stored_response(stored: Validated, request: httpx.Request) -> httpx.Response:
+    """Rebuild a 200 response from a stored GET body."""
+    headers = {"Content-Type": stored.content_type or "application/json"}
+    return httpx.Response(200, content=stored.body, headers=headers, request=request)
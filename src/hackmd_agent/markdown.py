@@ -0,0 +1,93 @@
+"""Markdown heading outline parsing."""
+
+import re
+from dataclasses import dataclass
+
+_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_FRONT_MATTER_END = ("---", "...")
+
+
+@dataclass(frozen=True)
+class Heading:
+    """An ATX heading and the character range of its section.
+
+    ``start`` is the offset of the heading line. The section ends at
+    ``end`` (next heading of the same or a higher level) or, without its
+    subsections, at ``body_end`` (next heading of any level).
+    """
+
+    level: int
+    title: str
+    start: int
+    body_end: int
+    end: int
+
+
+def parse_headings(content: str) -> list[Heading]:
+    """Parse the ATX (``#``) headings of a markdown document.
+
+    Headings inside fenced code blocks and YAML front matter are ignored.
+    Setext (underlined) headings are not recognized.
+    """
+    found: list[tuple[int, str, int]] = []
+    offset = 0
+    fence: str | None = None
+    lines = content.splitlines(keepends=True)
+    in_front_matter = bool(lines) and lines[0].rstrip() == "---"
+
+    for i, line in enumerate(lines):
+        line_start = offset
+        offset += len(line)
+        text = line.rstrip("\r\n")
+        if in_front_matter:
+            if i > 0 and text.rstrip() in _FRONT_MATTER_END:
+                in_front_matter = False
+            continue
+        fence_match = _FENCE.match(text)
+        if fence is not None:
+            # A closing fence uses the same character and is at least as long
+            if fence_match and fence_match.group(1).startswith(fence):
+                if not text.strip().lstrip(fence[0]):
+                    fence = None
+            continue
+        if fence_match:
+            fence = fence_match.group(1)
+            continue
+        match = _HEADING.match(text)
+        if match:
+            found.append(
+                (len(match.group(1)), (match.group(2) or "").strip(), line_start)
+            )
+
+    headings: list[Heading] = []
+    ends = [len(content)] * len(found)
+    open_sections: list[int] = []
+    for i, (level, _, start) in enumerate(found):
+        while open_sections and found[open_sections[-1]][0] >= level:
+            ends[open_sections.pop()] = start
+        open_sections.append(i)
+    for i, (level, title, start) in enumerate(found):
+        body_end = found[i + 1][2] if i + 1 < len(found) else len(content)
+        headings.append(Heading(level, title, start, body_end, ends[i]))
+    return headings
+
+
+def find_heading(headings: list[Heading], query: str) -> Heading | None:
+    """Find a heading by title, ignoring case and leading ``#`` marks.
+
+    Exact matches win over prefix matches, which win over substring matches.
+    """
+    wanted = query.strip().lstrip("#").strip().lower()
+    if not wanted:
+        return None
+    titles = [heading.title.lower() for heading in headings]
+    for matches in (
+        lambda title: title == wanted,
+        lambda title: title.startswith(wanted),
+        lambda title: wanted in title,
+    ):
+        for heading, title in zip(headings, titles):
+            if matches(title):
+                return heading
+    return None
@@ -2,31 +2,64 @@
 
 from __future__ import annotations
 
-import json
 import os
 import sys
-import time
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
 from typing import Any, Literal
 
 from fastmcp import FastMCP
 
+from hackmd_agent.cache import NoteListCache, OutlineCache
 from hackmd_agent.hackmd_client import HackMDClient, RetryInfo
+from hackmd_agent.response import (
+    NOTE_FIELDS,
+    NOTE_LIST_FIELDS,
+    NOTE_WRITE_FIELDS,
+    batch_items,
+    batch_result,
+    build_response,
+    note_outline,
+    note_section,
+    page_notes,
+    unique_ids,
+)
+from hackmd_agent.search_index import ContentIndex, TitleIndex, default_index_path
+from hackmd_agent.tokenizer import tokenize
 
 # Initialize FastMCP
 mcp = FastMCP("HackMD Agent")
 
 # Global client and cache
 _client: HackMDClient | None = None
-_notes_cache: tuple[list[dict[str, Any]], float] | None = None
-_CACHE_TTL_SECONDS = 60.0
+_content_index: ContentIndex | None = None
+_title_index = TitleIndex()
+_outline_cache = OutlineCache()
 
-# Store progress messages for the last request
-_last_progress: list[str] = []
+# Compact tool results: no whitespace, projected fields, _meta only when needed
+_compact_responses = os.environ.get("HACKMD_COMPACT_RESPONSES", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Progress messages of the tool call running in the current context. Each
+# call gets its own list, so concurrent calls do not see each other's messages.
+_progress_messages: ContextVar[list[str] | None] = ContextVar(
+    "progress_messages", default=None
+)
+
+
+def _begin_request() -> None:
+    """Start collecting progress messages for the current tool call."""
+    _progress_messages.set([])
 
 
 def _progress_callback(message: str) -> None:
     """Callback to track progress messages for AI agent transparency."""
-    _last_progress.append(message)
+    messages = _progress_messages.get()
+    if messages is not None:
+        messages.append(message)
 
 
 def get_client() -> HackMDClient:
@@ -36,25 +69,56 @@ def get_client() -> HackMDClient:
         token = os.environ.get("HACKMD_API_TOKEN")
         if not token:
             raise ValueError("HACKMD_API_TOKEN environment variable is required")
-        _client = HackMDClient(token)
+        # Requests per second; 0 disables client-side rate limiting
+        rate_limit = float(
+            os.environ.get("HACKMD_RATE_LIMIT", HackMDClient.DEFAULT_RATE_LIMIT)
+        )
+        _client = HackMDClient(
+            token,
+            rate_limit=rate_limit if rate_limit > 0 else None,
+            http2=os.environ.get("HACKMD_HTTP2") == "1",
+        )
     return _client
 
 
+def get_content_index() -> ContentIndex:
+    """Get or load the persistent content search index."""
+    global _content_index
+    if _content_index is None:
+        _content_index = ContentIndex(default_index_path())
+    return _content_index
+
+
+async def _fetch_note_list(
+    retry_info: RetryInfo | None,
+    progress_callback: Callable[[str], None] | None,
+) -> list[dict[str, Any]]:
+    return await get_client().get_note_list(
+        retry_info=retry_info,
+        progress_callback=progress_callback,
+    )
+
+
+# Served stale for up to the hard TTL while refreshing in the background
+_notes_cache = NoteListCache(
+    _fetch_note_list,
+    soft_ttl=float(
+        os.environ.get("HACKMD_CACHE_SOFT_TTL", NoteListCache.DEFAULT_SOFT_TTL)
+    ),
+    hard_ttl=float(
+        os.environ.get("HACKMD_CACHE_HARD_TTL", NoteListCache.DEFAULT_HARD_TTL)
+    ),
+)
+
+
 async def get_cached_notes(
     retry_info: RetryInfo | None = None,
 ) -> list[dict[str, Any]]:
-    """Get notes with simple in-memory caching."""
-    global _notes_cache
-    now = time.monotonic()
-    if _notes_cache is None or (now - _notes_cache[1]) > _CACHE_TTL_SECONDS:
-        client = get_client()
-        notes = await client.get_note_list(
-            retry_info=retry_info,
-            progress_callback=_progress_callback,
-        )
-        _notes_cache = (notes, now)
-        return notes
-    return _notes_cache[0]
+    """Get notes from the stale-while-revalidate cache."""
+    return await _notes_cache.get(
+        retry_info=retry_info,
+        progress_callback=_progress_callback,
+    )
 
 
 def _calculate_relevance(note: dict[str, Any], keyword: str) -> tuple[int, int]:
@@ -74,68 +138,119 @@ def _calculate_relevance(note: dict[str, Any], keyword: str) -> tuple[int, int]:
     if keyword_lower in title:
         return (70, len(title))
 
-    words = keyword_lower.split()
-    if any(w in title for w in words):
+    if any(token in title for token in tokenize(keyword_lower)):
         return (60, len(title))
 
     return (0, len(title))
 
 
-def _fuzzy_match(text: str, keyword: str, threshold: float = 0.6) -> bool:
-    """Simple fuzzy matching using character overlap ratio."""
-    text_lower = text.lower()
-    keyword_lower = keyword.lower()
+def _apply_write(note: dict[str, Any], content: str | None = None) -> None:
+    """Patch cached list and content index from a create/update response."""
+    _apply_writes([(note, content)])
 
-    if keyword_lower in text_lower:
-        return True
 
-    key_chars = set(keyword_lower.replace(" ", ""))
-    text_chars = set(text_lower.replace(" ", ""))
+def _apply_writes(writes: Iterable[tuple[dict[str, Any], str | None]]) -> None:
+    """Patch cached list and content index after one or more writes."""
+    notes = []
+    index = get_content_index()
+    for note, content in writes:
+        note_id = note.get("id")
+        if not note_id:
+            continue
+        notes.append(note)
+        if content is None:
+            content = note.get("content")
+        if content is not None:
+            # Without lastChangedAt the note is re-fetched on the next content sync
+            index.add(note_id, content, note.get("lastChangedAt"))
+    _notes_cache.patch(upserts=notes)
 
-    if not key_chars:
-        return False
 
-    overlap = len(key_chars & text_chars) / len(key_chars)
-    return overlap >= threshold
+def _apply_delete(note_id: str) -> None:
+    """Remove a deleted note from cached list and content index."""
+    _apply_deletes([note_id])
 
 
-def _invalidate_cache() -> None:
-    """Invalidate the notes cache."""
-    global _notes_cache
-    _notes_cache = None
+def _apply_deletes(note_ids: list[str]) -> None:
+    """Remove deleted notes from cached list and content index."""
+    index = get_content_index()
+    for note_id in note_ids:
+        index.remove(note_id)
+    _notes_cache.patch(removed=note_ids)
 
 
-def _build_response(data: Any, retry_info: RetryInfo) -> str:
+def _update_patch(
+    note_id: str,
+    note: dict[str, Any] | None,
+    read_permission: str | None,
+    write_permission: str | None,
+) -> dict[str, Any]:
+    """Note metadata to merge into the cached list after an update."""
+    patch: dict[str, Any] = {"id": note_id, **(note or {})}
+    if read_permission:
+        patch["readPermission"] = read_permission
+    if write_permission:
+        patch["writePermission"] = write_permission
+    return patch
+
+
+def _build_response(
+    data: Any,
+    retry_info: RetryInfo,
+    fields: tuple[str, ...] | None = None,
+    extra_meta: dict[str, Any] | None = None,
+) -> str:
     """Build JSON response with retry metadata for AI agent transparency."""
-    global _last_progress
-    result = {
-        "data": data,
-        "_meta": {
-            "retry_info": {
-                "was_rate_limited": retry_info.attempted,
-                "total_attempts": retry_info.total_attempts,
-                "total_wait_seconds": round(retry_info.final_wait_total, 2),
-            },
-            "progress_messages": _last_progress.copy() if _last_progress else None,
+    progress = _progress_messages.get()
+    _progress_messages.set(None)
+    return build_response(
+        data,
+        retry_info,
+        compact=_compact_responses,
+        fields=fields,
+        extra_meta={
+            **(extra_meta or {}),
+            "progress_messages": progress.copy() if progress else None,
         },
-    }
-    _last_progress = []
-    return json.dumps(result, indent=2, ensure_ascii=False)
+    )
 
 
 @mcp.tool()
-async def hackmd_list_notes() -> str:
+async def hackmd_list_notes(
+    offset: int = 0,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    sort: Literal[
+        "title", "-title", "createdAt", "-createdAt", "lastChangedAt", "-lastChangedAt"
+    ]
+    | None = None,
+) -> str:
     """
-    List all notes from HackMD.
-    Returns a JSON string containing an array of note metadata.
+    List notes from HackMD, served from the cached note list.
+
+    Args:
+        offset: Number of notes to skip (default: 0).
+        limit: Maximum number of notes to return (default: all).
+        fields: Note fields to return, e.g. ["title", "tags"]. The id is
+               always included. Default: all fields.
+        sort: Sort key; prefix with "-" for descending order.
+
+    Returns:
+        JSON string containing an array of note metadata. When offset or limit
+        is given, _meta.pagination holds total and next_offset.
     """
-    client = get_client()
+    _begin_request()
     retry_info = RetryInfo()
-    notes = await client.get_note_list(
-        retry_info=retry_info,
-        progress_callback=_progress_callback,
+    notes = await get_cached_notes(retry_info=retry_info)
+    page, pagination = page_notes(
+        notes, offset=offset, limit=limit, sort=sort, fields=fields
+    )
+    return _build_response(
+        page,
+        retry_info,
+        None if fields else NOTE_LIST_FIELDS,
+        {"pagination": pagination} if offset or limit is not None else None,
     )
-    return _build_response(notes, retry_info)
 
 
 @mcp.tool()
@@ -144,6 +259,7 @@ async def hackmd_read_note(note_id: str) -> str:
     Read a note's full content by its ID.
     Returns a JSON string containing the note metadata and content.
     """
+    _begin_request()
     client = get_client()
     retry_info = RetryInfo()
     note = await client.get_note(
@@ -151,7 +267,79 @@ async def hackmd_read_note(note_id: str) -> str:
         retry_info=retry_info,
         progress_callback=_progress_callback,
     )
-    return _build_response(note, retry_info)
+    return _build_response(note, retry_info, NOTE_FIELDS)
+
+
+@mcp.tool()
+async def hackmd_note_outline(note_id: str) -> str:
+    """
+    Get a note's heading outline with the size of each section in characters.
+    Use it with hackmd_read_section to read long notes piece by piece.
+    """
+    _begin_request()
+    retry_info = RetryInfo()
+    note = await get_client().get_note(
+        note_id,
+        retry_info=retry_info,
+        progress_callback=_progress_callback,
+    )
+    return _build_response(note_outline(note, _outline_cache.get(note)), retry_info)
+
+
+@mcp.tool()
+async def hackmd_read_section(
+    note_id: str,
+    heading: str,
+    include_subsections: bool = True,
+) -> str:
+    """
+    Read only the section of a note under a given heading.
+
+    Args:
+        note_id: The unique ID of the note.
+        heading: Heading title as shown by hackmd_note_outline. Matched
+                 case-insensitively, exact matches first, then prefixes.
+        include_subsections: Include nested subsections (default: True).
+
+    Returns:
+        JSON string containing the heading, its level and the section content.
+    """
+    _begin_request()
+    retry_info = RetryInfo()
+    note = await get_client().get_note(
+        note_id,
+        retry_info=retry_info,
+        progress_callback=_progress_callback,
+    )
+    section = note_section(note, _outline_cache.get(note), heading, include_subsections)
+    return _build_response(section, retry_info)
+
+
+@mcp.tool()
+async def hackmd_read_notes(note_ids: list[str]) -> str:
+    """
+    Read the full content of several notes concurrently in one call.
+
+    Args:
+        note_ids: IDs of the notes to read (at most 100).
+
+    Returns:
+        JSON string with "notes" (in request order) and "errors" (one entry
+        with id and error message per note that could not be read).
+    """
+    _begin_request()
+    ids = unique_ids(note_ids)
+    retry_info = RetryInfo()
+    results = {
+        note_id: result
+        async for note_id, result in get_client().get_notes_bulk(
+            ids,
+            retry_info=retry_info,
+            progress_callback=_progress_callback,
+        )
+    }
+    data = batch_result(ids, results, NOTE_FIELDS if _compact_responses else None)
+    return _build_response(data, retry_info)
 
 
 @mcp.tool()
@@ -173,6 +361,7 @@ async def hackmd_create_note(
     Returns:
         JSON string containing the created note's metadata.
     """
+    _begin_request()
     client = get_client()
     retry_info = RetryInfo()
     note = await client.create_note(
@@ -183,8 +372,8 @@ async def hackmd_create_note(
         retry_info=retry_info,
         progress_callback=_progress_callback,
     )
-    _invalidate_cache()
-    return _build_response(note, retry_info)
+    _apply_write(note, content)
+    return _build_response(note, retry_info, NOTE_WRITE_FIELDS)
 
 
 @mcp.tool()
@@ -206,6 +395,7 @@ async def hackmd_update_note(
     Returns:
         JSON string containing the updated note metadata.
     """
+    _begin_request()
     client = get_client()
     retry_info = RetryInfo()
     note = await client.update_note(
@@ -216,8 +406,11 @@ async def hackmd_update_note(
         retry_info=retry_info,
         progress_callback=_progress_callback,
     )
-    _invalidate_cache()
-    return _build_response(note, retry_info)
+    if not retry_info.skipped:
+        _apply_write(
+            _update_patch(note_id, note, read_permission, write_permission), content
+        )
+    return _build_response(note, retry_info, NOTE_WRITE_FIELDS)
 
 
 @mcp.tool()
@@ -225,6 +418,7 @@ async def hackmd_delete_note(note_id: str) -> str:
     """
     Permanently delete a note by its ID.
     """
+    _begin_request()
     client = get_client()
     retry_info = RetryInfo()
     await client.delete_note(
@@ -232,13 +426,151 @@ async def hackmd_delete_note(note_id: str) -> str:
         retry_info=retry_info,
         progress_callback=_progress_callback,
     )
-    _invalidate_cache()
+    _apply_delete(note_id)
     return _build_response(
         {"success": True, "message": "Note deleted"},
         retry_info,
     )
 
 
+@mcp.tool()
+async def hackmd_create_notes(notes: list[dict[str, str]]) -> str:
+    """
+    Create several notes concurrently in one call.
+
+    Args:
+        notes: Notes to create (at most 100). Each needs "title" and "content"
+               and may set "read_permission"/"write_permission".
+
+    Returns:
+        JSON string with "notes" (created notes in request order) and
+        "errors" (index and error message per note that failed).
+    """
+    _begin_request()
+    items = batch_items(notes, "notes")
+    if not all(item.get("title") and item.get("content") for item in items):
+        raise ValueError("every note needs a title and content")
+    retry_info = RetryInfo()
+    results = {
+        index: result
+        async for index, result in get_client().create_notes_bulk(
+            [
+                {
+                    "title": item["title"],
+                    "content": item["content"],
+                    "read_permission": item.get("read_permission"),
+                    "write_permission": item.get("write_permission"),
+                }
+                for item in items
+            ],
+            retry_info=retry_info,
+            progress_callback=_progress_callback,
+        )
+    }
+    _apply_writes(
+        (result, items[index]["content"])
+        for index, result in results.items()
+        if not isinstance(result, Exception)
+    )
+    data = batch_result(
+        range(len(items)),
+        results,
+        NOTE_WRITE_FIELDS if _compact_responses else None,
+        key_name="index",
+    )
+    return _build_response(data, retry_info)
+
+
+@mcp.tool()
+async def hackmd_update_notes(updates: list[dict[str, str]]) -> str:
+    """
+    Update several notes concurrently in one call.
+
+    Args:
+        updates: Updates to apply (at most 100). Each needs "note_id" and
+                 "content" and may set "read_permission"/"write_permission".
+
+    Returns:
+        JSON string with "notes" (updated notes in request order; unchanged
+        ones are only {"id", "skipped": true}) and "errors" (id and error
+        message per note that failed).
+    """
+    _begin_request()
+    items = batch_items(updates, "updates")
+    note_ids = [item.get("note_id") for item in items]
+    if not all(item.get("note_id") and item.get("content") for item in items):
+        raise ValueError("every update needs a note_id and content")
+    if len(set(note_ids)) != len(note_ids):
+        raise ValueError("each note_id may only be updated once per call")
+    by_id = {item["note_id"]: item for item in items}
+    retry_info = RetryInfo()
+    results = {
+        note_id: result
+        async for note_id, result in get_client().update_notes_bulk(
+            [
+                {
+                    "note_id": item["note_id"],
+                    "content": item["content"],
+                    "read_permission": item.get("read_permission"),
+                    "write_permission": item.get("write_permission"),
+                }
+                for item in items
+            ],
+            retry_info=retry_info,
+            progress_callback=_progress_callback,
+        )
+    }
+    _apply_writes(
+        (
+            _update_patch(
+                note_id,
+                result,
+                by_id[note_id].get("read_permission"),
+                by_id[note_id].get("write_permission"),
+            ),
+            by_id[note_id]["content"],
+        )
+        for note_id, result in results.items()
+        if not isinstance(result, Exception) and not result.get("skipped")
+    )
+    data = batch_result(
+        note_ids, results, NOTE_WRITE_FIELDS if _compact_responses else None
+    )
+    return _build_response(data, retry_info)
+
+
+@mcp.tool()
+async def hackmd_delete_notes(note_ids: list[str]) -> str:
+    """
+    Permanently delete several notes concurrently in one call.
+
+    Args:
+        note_ids: IDs of the notes to delete (at most 100).
+
+    Returns:
+        JSON string with "deleted" (IDs in request order) and "errors"
+        (id and error message per note that could not be deleted).
+    """
+    _begin_request()
+    ids = unique_ids(note_ids)
+    retry_info = RetryInfo()
+    results = {
+        note_id: result or note_id
+        async for note_id, result in get_client().delete_notes_bulk(
+            ids,
+            retry_info=retry_info,
+            progress_callback=_progress_callback,
+        )
+    }
+    _apply_deletes(
+        [note_id for note_id, result in results.items() if result == note_id]
+    )
+    data = batch_result(ids, results)
+    return _build_response(
+        {"deleted": data["notes"], "errors": data["errors"]}, retry_info
+    )
+
+
 @mcp.tool()
 async def hackmd_search_notes(
     keyword: str,
@@ -251,8 +583,11 @@ async def hackmd_search_notes(
 
     Args:
         keyword: The keyword to search for.
-        search_content: If True, also search within note content (slower).
-                       If False, only search titles (faster, uses cached list).
+        search_content: If True, also search within note content using the
+                       local content index (only changed notes are fetched).
+                       Content matches whole words; the last word may be a
+                       prefix ('hack' finds 'hackmd'). If False, only search
+                       titles.
         fuzzy: If True, enable fuzzy matching for typo tolerance.
               If False, use exact substring matching.
         limit: Maximum number of results to return (default: 20).
@@ -260,34 +595,31 @@ async def hackmd_search_notes(
     Returns:
         JSON string containing matching notes sorted by relevance.
     """
-    client = get_client()
+    _begin_request()
     retry_info = RetryInfo()
+    notes = await get_cached_notes(retry_info=retry_info)
 
+    content_matches: set[str] = set()
     if search_content:
-        notes, retry_info = await client.search_notes(
-            keyword,
-            search_content=True,
+        content_index = get_content_index()
+        await content_index.sync(
+            get_client(),
+            notes,
+            retry_info=retry_info,
             progress_callback=_progress_callback,
         )
-    else:
-        notes = await get_cached_notes(retry_info=retry_info)
+        content_matches = content_index.search(keyword)
 
-    keyword_lower = keyword.lower()
-    if fuzzy:
-        matched = [
-            (note, _calculate_relevance(note, keyword))
-            for note in notes
-            if _fuzzy_match(note.get("title", ""), keyword)
-        ]
-    else:
-        matched = [
-            (note, _calculate_relevance(note, keyword))
-            for note in notes
-            if keyword_lower in note.get("title", "").lower()
-        ]
+    _title_index.sync(notes)
+    matched = [
+        (note, _calculate_relevance(note, keyword))
+        for note in _title_index.matches(keyword, fuzzy, content_matches)
+    ]
 
     matched.sort(key=lambda x: (-x[1][0], x[1][1]))
-    return _build_response([note for note, _ in matched[:limit]], retry_info)
+    return _build_response(
+        [note for note, _ in matched[:limit]], retry_info, NOTE_LIST_FIELDS
+    )
 
 
 def main() -> None:
@@ -0,0 +1,388 @@
+"""Client-side rate limiting and failure handling for HackMD API requests."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+
+class QuotaExhaustedError(Exception):
+    """Raised instead of waiting when the API quota resets too far ahead."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(
+            f"HackMD API quota exhausted, resets in {_format_duration(retry_after)}"
+        )
+        self.retry_after = retry_after
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.0f} h"
+
+
+class TokenBucket:
+    """Token-bucket limiter shared by all requests of a client.
+
+    Every request takes one token before it is sent. Tokens refill at
+    ``rate`` per second up to ``burst``. ``pause()`` blocks all callers until
+    a deadline, which is used when the server answers 429.
+
+    When ``learn_from_headers`` is enabled, rate limit headers on responses
+    lower the refill rate so the remaining quota lasts until the window
+    resets. Only windows resetting within ``max_window`` seconds are learned
+    from; longer ones (e.g. a monthly quota) would throttle to a crawl. An
+    exhausted quota pauses callers if it resets within ``max_pause`` seconds
+    and otherwise makes ``acquire()`` raise ``QuotaExhaustedError``.
+    """
+
+    # Header names checked for quota information, in order of preference
+    REMAINING_HEADERS = ("x-ratelimit-userremaining", "x-ratelimit-remaining")
+    RESET_HEADERS = ("x-ratelimit-userreset", "x-ratelimit-reset")
+
+    def __init__(
+        self,
+        rate: float | None,
+        burst: int = 1,
+        learn_from_headers: bool = True,
+        min_rate: float = 0.1,
+        max_window: float = 300.0,
+        max_pause: float = 32.0,
+    ) -> None:
+        self.configured_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.learn_from_headers = learn_from_headers
+        self.min_rate = min_rate
+        self.max_window = max_window
+        self.max_pause = max_pause
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._exhausted_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            elapsed = now - self._updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token. Returns the number of seconds spent waiting.
+
+        Raises:
+            QuotaExhaustedError: While the quota is exhausted for longer than
+                ``max_pause``.
+        """
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._exhausted_until > now:
+                    raise QuotaExhaustedError(self._exhausted_until - now)
+                self._refill(now)
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate is None:
+                    return now - start
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - start
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> float:
+        """Block all callers for ``seconds``.
+
+        Returns how long callers still have to wait, which may be longer if an
+        earlier pause has not yet elapsed.
+        """
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        return self._paused_until - now
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Adjust the refill rate from rate limit response headers."""
+        if not self.learn_from_headers:
+            return
+        remaining = _first_number(headers, self.REMAINING_HEADERS)
+        reset = _first_number(headers, self.RESET_HEADERS)
+        if remaining is None or reset is None:
+            return
+
+        # Reset is either an absolute epoch timestamp or seconds until reset
+        seconds_left = reset - time.time() if reset > 1e9 else reset
+        if seconds_left <= 0:
+            self.rate = self.configured_rate
+            return
+        if remaining <= 0:
+            if seconds_left <= self.max_pause:
+                self.pause(seconds_left)
+            else:
+                self._exhausted_until = time.monotonic() + seconds_left
+            return
+        if seconds_left > self.max_window:
+            return
+
+        learned = max(self.min_rate, remaining / seconds_left)
+        if self.configured_rate is None:
+            self.rate = learned
+        else:
+            self.rate = min(self.configured_rate, learned)
+
+
+@dataclass
+class ConcurrencyStats:
+    """Snapshot of an adaptive concurrency limiter."""
+
+    window: int
+    in_flight: int
+    max_window: int
+    increases: int = 0
+    decreases: int = 0
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on the number of requests in flight.
+
+    The window grows by about one request per window of successful requests
+    whose latency stays within ``latency_tolerance`` times the fastest seen
+    (plus ``LATENCY_SLACK`` seconds), and is multiplied by ``backoff`` when a
+    request is answered with 429 or 5xx or fails to connect. Only requests
+    sent after the last decrease can shrink the window again, so one burst of
+    errors halves it once.
+    """
+
+    # Absolute allowance so jitter on very fast responses is not congestion
+    LATENCY_SLACK = 0.01
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._min_latency: float | None = None
+        self._last_decrease = 0.0
+        self._max_window = int(self._limit)
+        self._increases = 0
+        self._decreases = 0
+
+    @property
+    def window(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> float:
+        """Wait for a free slot. Returns the time the request was admitted."""
+        while self._in_flight >= self.window:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wake-up this waiter can no longer use to the next one
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+        self._in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float, overloaded: bool = False) -> None:
+        """Free a slot and adapt the window to the outcome of the request.
+
+        Args:
+            started: Value returned by ``acquire()`` for this request.
+            overloaded: True if the server signalled overload (429/5xx or
+                a connection error).
+        """
+        now = time.monotonic()
+        self._in_flight -= 1
+        if overloaded:
+            if started >= self._last_decrease:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_decrease = now
+                self._decreases += 1
+        else:
+            latency = now - started
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            healthy = (
+                latency
+                <= self._min_latency * self.latency_tolerance + self.LATENCY_SLACK
+            )
+            # Growth only matters while the window is actually used
+            if healthy and self._in_flight + 1 >= self.window:
+                before = self.window
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                if self.window > before:
+                    self._increases += 1
+                    self._max_window = max(self._max_window, self.window)
+        self._wake()
+
+    def cancel(self) -> None:
+        """Free a slot without adapting, e.g. when the request was cancelled."""
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.window - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def stats(self) -> ConcurrencyStats:
+        """Return a snapshot of the current window and counters."""
+        return ConcurrencyStats(
+            window=self.window,
+            in_flight=self._in_flight,
+            max_window=self._max_window,
+            increases=self._increases,
+            decreases=self._decreases,
+        )
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while a circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(
+            f"HackMD API unavailable ({name} circuit open), retry in {retry_after:.0f}s"
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+@dataclass
+class CircuitStats:
+    """Snapshot of a circuit breaker."""
+
+    state: str
+    failures: int
+    trips: int = 0
+    rejected: int = 0
+
+
+class CircuitBreaker:
+    """Fail fast while an endpoint keeps failing.
+
+    - closed: requests pass; ``failure_threshold`` consecutive failures
+      (5xx or connection errors) open the circuit.
+    - open: ``before_request()`` raises ``CircuitOpenError`` for
+      ``reset_timeout`` seconds.
+    - half-open: one probe request is let through; its success closes the
+      circuit, its failure opens it again. A probe that never reports back
+      is replaced after ``reset_timeout``.
+
+    A ``failure_threshold`` of 0 disables the breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = -math.inf
+        self._trips = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half_open``."""
+        if (
+            self._state == "open"
+            and time.monotonic() >= self._opened_at + self.reset_timeout
+        ):
+            return "half_open"
+        return self._state
+
+    def before_request(self) -> None:
+        """Check that a request may be sent.
+
+        Raises:
+            CircuitOpenError: While the circuit is open or another request is
+                probing it.
+        """
+        if self._state == "closed":
+            return
+        now = time.monotonic()
+        if self._state == "open":
+            remaining = self._opened_at + self.reset_timeout - now
+            if remaining > 0:
+                self._rejected += 1
+                raise CircuitOpenError(self.name, remaining)
+            self._state = "half_open"
+        elif now - self._probe_started < self.reset_timeout:
+            self._rejected += 1
+            raise CircuitOpenError(self.name, 0.0)
+        self._probe_started = now
+
+    def record_success(self) -> None:
+        """Close the circuit after a request got a non-5xx answer."""
+        self._state = "closed"
+        self._failures = 0
+        self._probe_started = -math.inf
+
+    def record_failure(self) -> None:
+        """Count a 5xx answer or connection error."""
+        if self.failure_threshold <= 0 or self._state == "open":
+            return
+        self._failures += 1
+        if self._state == "half_open" or self._failures >= self.failure_threshold:
+            self._state = "open"
+            self._opened_at = time.monotonic()
+            self._trips += 1
+
+    def cancel(self) -> None:
+        """Forget a request that ended without an answer, e.g. cancelled."""
+        if self._state == "half_open":
+            self._probe_started = -math.inf
+
+    def stats(self) -> CircuitStats:
+        """Return a snapshot of the state and counters."""
+        return CircuitStats(
+            state=self.state,
+            failures=self._failures,
+            trips=self._trips,
+            rejected=self._rejected,
+        )
+
+
+def _first_number(headers: Mapping[str, str], names: tuple[str, ...]) -> float | None:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,201 @@
+"""JSON encoding of tool results."""
+
+import json
+from collections.abc import Sequence
+from typing import Any
+
+from .hackmd_client import RetryInfo
+from .markdown import Heading, find_heading
+
+# Fields kept per tool in compact mode. HackMD returns many more (user and
+# team paths, permissions, timestamps) that the model rarely needs.
+NOTE_LIST_FIELDS = ("id", "title", "tags", "lastChangedAt")
+NOTE_FIELDS = ("id", "title", "tags", "lastChangedAt", "content")
+NOTE_WRITE_FIELDS = (
+    "id",
+    "title",
+    "lastChangedAt",
+    "publishLink",
+    "readPermission",
+    "writePermission",
+    "skipped",
+)
+
+
+def project(data: Any, fields: Sequence[str]) -> Any:
+    """Keep only ``fields`` of a note dict or of each note in a list."""
+    if isinstance(data, dict):
+        return {k: data[k] for k in fields if k in data}
+    if isinstance(data, list):
+        return [project(item, fields) for item in data]
+    return data
+
+
+def build_response(
+    data: Any,
+    retry_info: RetryInfo,
+    compact: bool = False,
+    fields: Sequence[str] | None = None,
+    extra_meta: dict[str, Any] | None = None,
+) -> str:
+    """Build a JSON tool result with retry metadata.
+
+    The default output is pretty-printed and complete. With ``compact`` the
+    JSON has no whitespace, ``data`` is projected to ``fields`` and ``_meta``
+    is left out unless a retry happened or ``extra_meta`` has a value.
+    ``_meta.skipped`` is set when the client skipped the request and
+    ``_meta.stale`` when it returned cached data because the API is down.
+    """
+    retry = {
+        "was_rate_limited": retry_info.attempted,
+        "total_attempts": retry_info.total_attempts,
+        "total_wait_seconds": round(retry_info.final_wait_total, 2),
+    }
+    if retry_info.skipped:
+        extra_meta = {"skipped": True, **(extra_meta or {})}
+    if retry_info.stale:
+        extra_meta = {"stale": True, **(extra_meta or {})}
+    if not compact:
+        meta = {"retry_info": retry, **(extra_meta or {})}
+        return json.dumps({"data": data, "_meta": meta}, indent=2, ensure_ascii=False)
+
+    if fields is not None:
+        data = project(data, fields)
+    result: dict[str, Any] = {"data": data}
+    compact_meta = {k: v for k, v in (extra_meta or {}).items() if v}
+    if retry_info.attempted:
+        compact_meta = {"retry_info": retry, **compact_meta}
+    if compact_meta:
+        result["_meta"] = compact_meta
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False)
+
+
+NOTE_SORT_KEYS = ("title", "createdAt", "lastChangedAt")
+
+# Most notes a single batch tool call may touch
+MAX_BATCH_SIZE = 100
+
+
+def page_notes(
+    notes: list[dict[str, Any]],
+    offset: int = 0,
+    limit: int | None = None,
+    sort: str | None = None,
+    fields: Sequence[str] | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Sort, slice and project a note list.
+
+    ``sort`` is one of ``NOTE_SORT_KEYS``, prefixed with ``-`` for descending
+    order. ``fields`` always includes ``id``. Returns the page and pagination
+    metadata; ``next_offset`` is None on the last page.
+    """
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must not be negative")
+    if sort:
+        key = sort.removeprefix("-")
+        if key not in NOTE_SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(NOTE_SORT_KEYS)}")
+        # Notes without the field go last in both directions
+        present = [n for n in notes if n.get(key) is not None]
+        missing = [n for n in notes if n.get(key) is None]
+        present.sort(key=lambda n: _sort_value(n[key]), reverse=sort[0] == "-")
+        notes = present + missing
+
+    end = len(notes) if limit is None else offset + limit
+    page = notes[offset:end]
+    if fields:
+        page = project(page, ["id", *(f for f in fields if f != "id")])
+    pagination = {
+        "total": len(notes),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": end if end < len(notes) else None,
+    }
+    return page, pagination
+
+
+def _sort_value(value: Any) -> Any:
+    return value.lower() if isinstance(value, str) else value
+
+
+def unique_ids(note_ids: Any) -> list[str]:
+    """Validate a batch of note IDs, dropping duplicates but keeping order."""
+    if not isinstance(note_ids, list) or not note_ids:
+        raise ValueError("noteIds must be a non-empty list")
+    if len(note_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"at most {MAX_BATCH_SIZE} notes per call")
+    if not all(isinstance(note_id, str) and note_id for note_id in note_ids):
+        raise ValueError("noteIds must be non-empty strings")
+    return list(dict.fromkeys(note_ids))
+
+
+def batch_items(items: Any, name: str) -> list[dict[str, Any]]:
+    """Validate a batch of objects passed to a batch write tool."""
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"{name} must be a non-empty list")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"at most {MAX_BATCH_SIZE} notes per call")
+    if not all(isinstance(item, dict) for item in items):
+        raise ValueError(f"{name} must contain objects")
+    return items
+
+
+def batch_result(
+    keys: Sequence[Any],
+    results: dict[Any, Any],
+    fields: Sequence[str] | None = None,
+    key_name: str = "id",
+) -> dict[str, list[Any]]:
+    """Split per-item results into successes and errors, in request order.
+
+    ``results`` maps each key (note ID, or position for creates) to its result
+    or the exception it raised. Successful results are projected to
+    ``fields`` when given; errors are reported under ``key_name``.
+    """
+    succeeded: list[Any] = []
+    errors: list[dict[str, Any]] = []
+    for key in keys:
+        result = results[key]
+        if isinstance(result, Exception):
+            errors.append({key_name: key, "error": str(result)})
+        else:
+            succeeded.append(project(result, fields) if fields else result)
+    return {"notes": succeeded, "errors": errors}
+
+
+def note_outline(note: dict[str, Any], headings: list[Heading]) -> dict[str, Any]:
+    """Describe a note's heading tree with the size of each section."""
+    return {
+        "id": note.get("id"),
+        "title": note.get("title"),
+        "lastChangedAt": note.get("lastChangedAt"),
+        "chars": len(note.get("content") or ""),
+        "outline": [
+            {
+                "level": heading.level,
+                "title": heading.title,
+                "chars": heading.end - heading.start,
+            }
+            for heading in headings
+        ],
+    }
+
+
+def note_section(
+    note: dict[str, Any],
+    headings: list[Heading],
+    query: str,
+    include_subsections: bool = True,
+) -> dict[str, Any]:
+    """Extract the section of a note under the heading matching ``query``."""
+    heading = find_heading(headings, query)
+    if heading is None:
+        available = ", ".join(h.title for h in headings[:20]) or "none"
+        raise ValueError(f"Heading not found: {query} (available: {available})")
+    end = heading.end if include_subsections else heading.body_end
+    return {
+        "id": note.get("id"),
+        "heading": heading.title,
+        "level": heading.level,
+        "content": (note.get("content") or "")[heading.start : end],
+    }
@@ -0,0 +1,396 @@
+"""Search indexes over note titles and content.
+
+``ContentIndex`` is a persistent inverted index over note content and
+``TitleIndex`` is an in-memory character n-gram index over note titles.
+"""
+
+import asyncio
+import json
+import os
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from .hackmd_client import HackMDClient, RetryInfo
+from .tokenizer import char_ngrams, is_cjk, tokenize
+
+# Bump when the tokenizer changes so stale indexes are rebuilt
+INDEX_FORMAT_VERSION = 2
+
+
+def default_index_path() -> Path:
+    """Return the on-disk location of the content index.
+
+    Uses ``HACKMD_INDEX_PATH`` when set, otherwise the user cache directory.
+    """
+    env_path = os.environ.get("HACKMD_INDEX_PATH")
+    if env_path:
+        return Path(env_path)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "hackmd-agent" / "content-index.json"
+
+
+class ContentIndex:
+    """Inverted index (term -> note ID -> positions) over note content.
+
+    The index remembers the ``lastChangedAt`` value each note was indexed at,
+    so ``sync()`` only re-fetches notes that changed since the last sync.
+
+    Queries match whole words, except that the last word of a query also
+    matches as a prefix (``"hack"`` finds ``"hackmd"``); CJK text matches
+    any substring through its bigrams.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._postings: dict[str, dict[str, list[int]]] = {}
+        self._note_terms: dict[str, set[str]] = {}
+        self._versions: dict[str, Any] = {}
+        # Built on demand for prefix lookups; reset when terms change
+        self._sorted_terms: list[str] | None = None
+        # Bumped on every change; the index is dirty until a save covers it
+        self._generation = 0
+        self._saved_generation = 0
+        self._sync_lock = asyncio.Lock()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._note_terms)
+
+    def __contains__(self, note_id: object) -> bool:
+        return note_id in self._note_terms
+
+    def add(self, note_id: str, content: str, changed_at: Any = None) -> None:
+        """Index (or re-index) a note's content."""
+        self.remove(note_id)
+        positions: dict[str, list[int]] = {}
+        for position, term in enumerate(tokenize(content)):
+            positions.setdefault(term, []).append(position)
+        for term, term_positions in positions.items():
+            self._postings.setdefault(term, {})[note_id] = term_positions
+        self._note_terms[note_id] = set(positions)
+        self._versions[note_id] = changed_at
+        self._sorted_terms = None
+        self._generation += 1
+
+    def remove(self, note_id: str) -> None:
+        """Remove a note from the index."""
+        terms = self._note_terms.pop(note_id, None)
+        self._versions.pop(note_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(note_id, None)
+            if not postings:
+                del self._postings[term]
+        self._sorted_terms = None
+        self._generation += 1
+
+    def search(self, query: str) -> set[str]:
+        """Return IDs of notes containing the query terms as a phrase.
+
+        The last term may be the prefix of an indexed word.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return set()
+        postings: list[dict[str, list[int]]] = []
+        for i, term in enumerate(terms):
+            if len(term) == 1 and is_cjk(term):
+                term_postings = self._char_postings(term)
+            elif i == len(terms) - 1 and not is_cjk(term[0]):
+                term_postings = self._prefix_postings(term)
+            else:
+                term_postings = self._postings.get(term, {})
+            if not term_postings:
+                return set()
+            postings.append(term_postings)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if len(terms) == 1:
+            return candidates
+
+        matches = set()
+        for note_id in candidates:
+            following = [set(p[note_id]) for p in postings[1:]]
+            if any(
+                all(
+                    start + offset in positions
+                    for offset, positions in enumerate(following, start=1)
+                )
+                for start in postings[0][note_id]
+            ):
+                matches.add(note_id)
+        return matches
+
+    def _prefix_postings(self, prefix: str) -> dict[str, list[int]]:
+        """Merged postings of every indexed word starting with ``prefix``."""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        merged: dict[str, set[int]] = {}
+        for i in range(bisect_left(terms, prefix), len(terms)):
+            if not terms[i].startswith(prefix):
+                break
+            for note_id, positions in self._postings[terms[i]].items():
+                merged.setdefault(note_id, set()).update(positions)
+        return {note_id: sorted(p) for note_id, p in merged.items()}
+
+    def _char_postings(self, term: str) -> dict[str, list[int]]:
+        """Postings for a lone CJK character.
+
+        Covers the character on its own and inside every indexed bigram.
+        """
+        if len(term) != 1 or not is_cjk(term):
+            return {}
+        merged: dict[str, set[int]] = {}
+        for indexed_term, postings in self._postings.items():
+            if term not in indexed_term:
+                continue
+            for note_id, positions in postings.items():
+                merged.setdefault(note_id, set()).update(positions)
+        return {note_id: sorted(p) for note_id, p in merged.items()}
+
+    def stale_notes(self, notes: Iterable[dict[str, Any]]) -> list[str]:
+        """Return IDs of listed notes that are missing or outdated in the index."""
+        stale = []
+        for note in notes:
+            note_id = note.get("id", "")
+            changed_at = note.get("lastChangedAt")
+            if (
+                note_id not in self._note_terms
+                or changed_at is None
+                or self._versions.get(note_id) != changed_at
+            ):
+                stale.append(note_id)
+        return stale
+
+    async def sync(
+        self,
+        client: HackMDClient,
+        notes: list[dict[str, Any]],
+        retry_info: RetryInfo | None = None,
+        progress_callback: Callable[[str], None] | None = None,
+    ) -> None:
+        """Bring the index up to date with the given note list.
+
+        Notes no longer listed are dropped and only new or changed notes are
+        fetched. The index is saved to disk, in a worker thread, when anything
+        changed.
+        """
+        async with self._sync_lock:
+            listed = {note.get("id", "") for note in notes}
+            for note_id in list(self._note_terms):
+                if note_id not in listed:
+                    self.remove(note_id)
+
+            changed_at = {
+                note.get("id", ""): note.get("lastChangedAt") for note in notes
+            }
+            stale = self.stale_notes(notes)
+            total = len(stale)
+            done = 0
+            async for note_id, full_note in client.get_notes_bulk(
+                stale,
+                retry_info=retry_info,
+                progress_callback=progress_callback,
+            ):
+                done += 1
+                if progress_callback and done % 20 == 0:
+                    progress_callback(f"Indexing note content... {done}/{total}")
+                if isinstance(full_note, Exception):
+                    continue
+                self.add(note_id, full_note.get("content", ""), changed_at[note_id])
+
+            # Writers such as add() do not take the lock, so the thread gets
+            # a snapshot taken here on the loop rather than the live index
+            if self._generation != self._saved_generation and self.path is not None:
+                generation, data = self._snapshot()
+                await asyncio.to_thread(self._write, self.path, data)
+                self._saved_generation = max(self._saved_generation, generation)
+
+    def load(self) -> None:
+        """Load the index from disk, starting empty if it is unreadable."""
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("format_version") != INDEX_FORMAT_VERSION:
+            return
+        self._postings = data.get("postings", {})
+        self._versions = data.get("versions", {})
+        self._sorted_terms = None
+        self._note_terms = {note_id: set() for note_id in self._versions}
+        for term, postings in self._postings.items():
+            for note_id in postings:
+                self._note_terms.setdefault(note_id, set()).add(term)
+        self._saved_generation = self._generation
+
+    def save(self) -> None:
+        """Write the index to disk atomically."""
+        if self.path is None:
+            return
+        generation, data = self._snapshot()
+        self._write(self.path, data)
+        self._saved_generation = max(self._saved_generation, generation)
+
+    def _snapshot(self) -> tuple[int, dict[str, Any]]:
+        """Copy the index state with the generation it reflects.
+
+        Position lists are replaced rather than mutated, so copying the
+        posting dicts is enough to detach the snapshot from later changes.
+        """
+        data = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "versions": dict(self._versions),
+            "postings": {term: dict(p) for term, p in self._postings.items()},
+        }
+        return self._generation, data
+
+    @staticmethod
+    def _write(path: Path, data: dict[str, Any]) -> None:
+        """Write a snapshot to disk atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+
+class TitleIndex:
+    """Character bigram index over note titles.
+
+    Substring queries intersect the posting sets of the query's bigrams and
+    verify the few remaining candidates, instead of scanning every title.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, set[str]] = {}
+        self._titles: dict[str, str] = {}
+        self._notes: dict[str, dict[str, Any]] = {}
+        self._order: dict[str, int] = {}
+        self._last_notes: list[dict[str, Any]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    @staticmethod
+    def _grams(text: str) -> set[str]:
+        if len(text) == 1:
+            return {text}
+        return {text[i : i + 2] for i in range(len(text) - 1)}
+
+    def sync(self, notes: list[dict[str, Any]]) -> None:
+        """Update the index to match a note list, re-indexing changed titles.
+
+        Syncing the same list object again is a no-op, so callers must replace
+        their note list rather than mutate it in place.
+        """
+        if notes is self._last_notes:
+            return
+        listed = set()
+        for position, note in enumerate(notes):
+            note_id = note.get("id", "")
+            title = note.get("title", "").lower()
+            listed.add(note_id)
+            self._notes[note_id] = note
+            self._order[note_id] = position
+            if self._titles.get(note_id) != title:
+                self._remove(note_id)
+                self._titles[note_id] = title
+                for gram in self._grams(title):
+                    self._postings.setdefault(gram, set()).add(note_id)
+        for note_id in list(self._titles):
+            if note_id not in listed:
+                self._remove(note_id)
+                self._notes.pop(note_id, None)
+                self._order.pop(note_id, None)
+        self._last_notes = notes
+
+    def _remove(self, note_id: str) -> None:
+        title = self._titles.pop(note_id, None)
+        if title is None:
+            return
+        for gram in self._grams(title):
+            postings = self._postings.get(gram)
+            if postings is None:
+                continue
+            postings.discard(note_id)
+            if not postings:
+                del self._postings[gram]
+
+    def get(self, note_id: str) -> dict[str, Any] | None:
+        """Return the listed note with the given ID."""
+        return self._notes.get(note_id)
+
+    def position(self, note_id: str) -> int:
+        """Position of the note in the last synced list (for stable ordering)."""
+        return self._order.get(note_id, len(self._order))
+
+    def matches(
+        self,
+        keyword: str,
+        fuzzy: bool = False,
+        extra_ids: set[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return matching notes in list order.
+
+        Args:
+            keyword: Substring (or fuzzy pattern) to find in titles.
+            fuzzy: Use ``fuzzy_search`` instead of substring matching.
+            extra_ids: Additional note IDs to include (e.g. content matches).
+        """
+        ids = self.fuzzy_search(keyword) if fuzzy else self.search(keyword)
+        if extra_ids:
+            ids |= extra_ids
+        return [
+            self._notes[note_id]
+            for note_id in sorted(
+                (i for i in ids if i in self._notes), key=self.position
+            )
+        ]
+
+    def search(self, keyword: str) -> set[str]:
+        """Return IDs of notes whose title contains ``keyword``."""
+        keyword_lower = keyword.lower()
+        if not keyword_lower:
+            return set(self._titles)
+        if len(keyword_lower) == 1:
+            candidates: set[str] = set()
+            for gram, postings in self._postings.items():
+                if keyword_lower in gram:
+                    candidates |= postings
+        else:
+            gram_postings = [
+                self._postings.get(gram, set()) for gram in self._grams(keyword_lower)
+            ]
+            candidates = set.intersection(*gram_postings)
+        return {
+            note_id for note_id in candidates if keyword_lower in self._titles[note_id]
+        }
+
+    def fuzzy_search(self, keyword: str, threshold: float = 0.6) -> set[str]:
+        """Return IDs of notes whose title approximately matches ``keyword``.
+
+        A title matches when it contains the keyword, or when at least
+        ``threshold`` of the keyword's in-word character bigrams occur in it.
+        """
+        matches = self.search(keyword)
+        grams = char_ngrams(keyword)
+        if not grams:
+            return matches
+        hits: dict[str, int] = {}
+        for gram in grams:
+            for note_id in self._postings.get(gram, ()):
+                hits[note_id] = hits.get(note_id, 0) + 1
+        needed = threshold * len(grams)
+        matches.update(note_id for note_id, count in hits.items() if count >= needed)
+        return matches
@@ -0,0 +1,64 @@
+"""CJK-aware tokenization for note search.
+
+Whitespace does not separate words in Chinese or Japanese text, so CJK runs
+are split into overlapping character bigrams while other scripts are split
+into word tokens. A query that is a substring of a CJK run produces a
+contiguous subsequence of that run's bigrams, which lets the indexes answer
+substring queries with phrase lookups.
+"""
+
+import re
+
+# CJK ideographs, kana, Hangul and full-width compatibility ideographs
+_CJK_CHARS = (
+    r"\u3040-\u30ff"  # Hiragana, Katakana
+    r"\u3400-\u4dbf"  # CJK Unified Ideographs Extension A
+    r"\u4e00-\u9fff"  # CJK Unified Ideographs
+    r"\uac00-\ud7af"  # Hangul Syllables
+    r"\uf900-\ufaff"  # CJK Compatibility Ideographs
+)
+_TOKEN_RE = re.compile(rf"([{_CJK_CHARS}]+)|([^\W_{_CJK_CHARS}]+)")
+_CJK_RE = re.compile(rf"[{_CJK_CHARS}]")
+
+
+def is_cjk(char: str) -> bool:
+    """Return True if ``char`` is a CJK character."""
+    return bool(_CJK_RE.fullmatch(char))
+
+
+def _bigrams(run: str) -> list[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[i : i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search tokens.
+
+    Latin (and other space-delimited) words become one token each; CJK runs
+    become character bigrams. Token order is preserved so list indexes can be
+    used as positions.
+
+    Example:
+        >>> tokenize("HackMD 會議記錄")
+        ['hackmd', '會議', '議記', '記錄']
+    """
+    tokens: list[str] = []
+    for cjk_run, word in _TOKEN_RE.findall(text.lower()):
+        if cjk_run:
+            tokens.extend(_bigrams(cjk_run))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def char_ngrams(text: str) -> set[str]:
+    """Return the character bigrams inside each word or CJK run of ``text``.
+
+    Used for typo-tolerant matching: ``"projct"`` and ``"project"`` share
+    most of their bigrams even though the words differ.
+    """
+    grams: set[str] = set()
+    for cjk_run, word in _TOKEN_RE.findall(text.lower()):
+        grams.update(_bigrams(cjk_run or word))
+    return grams
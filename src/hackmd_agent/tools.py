@@ -1,24 +1,82 @@
 """HackMD tools for AI agents."""
 
-import json
+from collections.abc import Callable, Iterable
+from pathlib import Path
 from typing import Any
 
+from .cache import NoteListCache, OutlineCache
 from .hackmd_client import HackMDClient, RetryInfo
+from .response import (
+    MAX_BATCH_SIZE,
+    NOTE_FIELDS,
+    NOTE_LIST_FIELDS,
+    NOTE_SORT_KEYS,
+    NOTE_WRITE_FIELDS,
+    batch_items,
+    batch_result,
+    build_response,
+    note_outline,
+    note_section,
+    page_notes,
+    unique_ids,
+)
+from .search_index import ContentIndex, TitleIndex, default_index_path
+from .tokenizer import tokenize
 from .types import Tool
 
 
-def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Tool]:
+def create_hackmd_tools(
+    api_token: str,
+    base_url: str | None = None,
+    index_path: str | Path | None = None,
+    client: HackMDClient | None = None,
+    compact: bool = False,
+) -> list[Tool]:
     """
     Create HackMD tools for AI agents.
-    Provides: list_notes, read_note, create_note, update_note, delete_note, search_notes
+    Provides: list_notes, read_note, read_notes, note_outline, read_section,
+    create_note(s), update_note(s), delete_note(s), search_notes
+
+    Content searches use a persistent index stored at ``index_path``
+    (default: ``default_index_path()``). Pass ``client`` to reuse an existing
+    ``HackMDClient`` instead of creating one. With ``compact``, results are
+    encoded without whitespace, limited to the fields the model needs and
+    omit ``_meta`` when no retry happened.
     """
-    client = HackMDClient(api_token, base_url or "https://api.hackmd.io/v1")
+    if client is None:
+        client = HackMDClient(api_token, base_url or "https://api.hackmd.io/v1")
+    content_index = ContentIndex(index_path or default_index_path())
+    title_index = TitleIndex()
+
+    async def fetch_notes(
+        retry_info: RetryInfo | None,
+        progress_callback: Callable[[str], None] | None,
+    ) -> list[dict[str, Any]]:
+        return await client.get_note_list(
+            retry_info=retry_info, progress_callback=progress_callback
+        )
+
+    # Served stale while refreshing in the background; writes patch it in place
+    notes_cache = NoteListCache(fetch_notes)
+    outline_cache = OutlineCache()
 
-    async def list_notes(_input: Any) -> str:
-        """List all notes from HackMD."""
+    async def list_notes(input_data: Any) -> str:
+        """List notes from HackMD, optionally sorted, paged and projected."""
+        params = input_data if isinstance(input_data, dict) else {}
+        offset = params.get("offset", 0)
+        limit = params.get("limit")
+        fields = params.get("fields")
         retry_info = RetryInfo()
-        notes = await client.get_note_list(retry_info=retry_info)
-        return _build_response(notes, retry_info)
+        notes = await notes_cache.get(retry_info=retry_info)
+        page, pagination = page_notes(
+            notes, offset=offset, limit=limit, sort=params.get("sort"), fields=fields
+        )
+        return _build_response(
+            page,
+            retry_info,
+            None if fields else NOTE_LIST_FIELDS,
+            {"pagination": pagination} if offset or limit is not None else None,
+        )
 
     async def read_note(input_data: Any) -> str:
         """Read a note by ID."""
@@ -27,7 +85,49 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
             raise ValueError("noteId is required")
         retry_info = RetryInfo()
         note = await client.get_note(note_id, retry_info=retry_info)
-        return _build_response(note, retry_info)
+        return _build_response(note, retry_info, NOTE_FIELDS)
+
+    async def note_outline_tool(input_data: Any) -> str:
+        """Return the heading outline of a note."""
+        note_id = input_data.get("noteId") if isinstance(input_data, dict) else None
+        if not note_id:
+            raise ValueError("noteId is required")
+        retry_info = RetryInfo()
+        note = await client.get_note(note_id, retry_info=retry_info)
+        return _build_response(note_outline(note, outline_cache.get(note)), retry_info)
+
+    async def read_section(input_data: Any) -> str:
+        """Read one section of a note by its heading."""
+        if not isinstance(input_data, dict):
+            raise ValueError("Invalid input")
+        note_id = input_data.get("noteId")
+        heading = input_data.get("heading")
+        if not note_id or not heading:
+            raise ValueError("noteId and heading are required")
+        retry_info = RetryInfo()
+        note = await client.get_note(note_id, retry_info=retry_info)
+        section = note_section(
+            note,
+            outline_cache.get(note),
+            heading,
+            input_data.get("includeSubsections", True),
+        )
+        return _build_response(section, retry_info)
+
+    async def read_notes(input_data: Any) -> str:
+        """Read many notes concurrently in one call."""
+        if not isinstance(input_data, dict):
+            raise ValueError("Invalid input")
+        note_ids = unique_ids(input_data.get("noteIds"))
+        retry_info = RetryInfo()
+        results = {
+            note_id: result
+            async for note_id, result in client.get_notes_bulk(
+                note_ids, retry_info=retry_info
+            )
+        }
+        data = batch_result(note_ids, results, NOTE_FIELDS if compact else None)
+        return _build_response(data, retry_info)
 
     async def create_note(input_data: Any) -> str:
         """Create a new note."""
@@ -45,7 +145,8 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
             write_permission=input_data.get("writePermission"),
             retry_info=retry_info,
         )
-        return _build_response(note, retry_info)
+        apply_writes([(note, content)])
+        return _build_response(note, retry_info, NOTE_WRITE_FIELDS)
 
     async def update_note(input_data: Any) -> str:
         """Update an existing note."""
@@ -63,7 +164,9 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
             write_permission=input_data.get("writePermission"),
             retry_info=retry_info,
         )
-        return _build_response(note, retry_info)
+        if not retry_info.skipped:
+            apply_writes([(update_patch(input_data, note), content)])
+        return _build_response(note, retry_info, NOTE_WRITE_FIELDS)
 
     async def delete_note(input_data: Any) -> str:
         """Delete a note."""
@@ -72,8 +175,125 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
             raise ValueError("noteId is required")
         retry_info = RetryInfo()
         await client.delete_note(note_id, retry_info=retry_info)
+        apply_deletes([note_id])
         return _build_response({"success": True, "message": "Note deleted"}, retry_info)
 
+    async def create_notes(input_data: Any) -> str:
+        """Create many notes concurrently in one call."""
+        if not isinstance(input_data, dict):
+            raise ValueError("Invalid input")
+        items = batch_items(input_data.get("notes"), "notes")
+        if not all(item.get("title") and item.get("content") for item in items):
+            raise ValueError("every note needs a title and content")
+        retry_info = RetryInfo()
+        results = {
+            index: result
+            async for index, result in client.create_notes_bulk(
+                [
+                    {
+                        "title": item["title"],
+                        "content": item["content"],
+                        "read_permission": item.get("readPermission"),
+                        "write_permission": item.get("writePermission"),
+                    }
+                    for item in items
+                ],
+                retry_info=retry_info,
+            )
+        }
+        apply_writes(
+            (result, items[index]["content"])
+            for index, result in results.items()
+            if not isinstance(result, Exception)
+        )
+        data = batch_result(
+            range(len(items)),
+            results,
+            NOTE_WRITE_FIELDS if compact else None,
+            key_name="index",
+        )
+        return _build_response(data, retry_info)
+
+    async def update_notes(input_data: Any) -> str:
+        """Update many notes concurrently in one call."""
+        if not isinstance(input_data, dict):
+            raise ValueError("Invalid input")
+        items = batch_items(input_data.get("notes"), "notes")
+        note_ids = [item.get("noteId") for item in items]
+        if not all(item.get("noteId") and item.get("content") for item in items):
+            raise ValueError("every note needs a noteId and content")
+        if len(set(note_ids)) != len(note_ids):
+            raise ValueError("each noteId may only be updated once per call")
+        by_id = {item["noteId"]: item for item in items}
+        retry_info = RetryInfo()
+        results = {
+            note_id: result
+            async for note_id, result in client.update_notes_bulk(
+                [
+                    {
+                        "note_id": item["noteId"],
+                        "content": item["content"],
+                        "read_permission": item.get("readPermission"),
+                        "write_permission": item.get("writePermission"),
+                    }
+                    for item in items
+                ],
+                retry_info=retry_info,
+            )
+        }
+        apply_writes(
+            (update_patch(by_id[note_id], result), by_id[note_id]["content"])
+            for note_id, result in results.items()
+            if not isinstance(result, Exception) and not result.get("skipped")
+        )
+        data = batch_result(note_ids, results, NOTE_WRITE_FIELDS if compact else None)
+        return _build_response(data, retry_info)
+
+    async def delete_notes(input_data: Any) -> str:
+        """Delete many notes concurrently in one call."""
+        if not isinstance(input_data, dict):
+            raise ValueError("Invalid input")
+        note_ids = unique_ids(input_data.get("noteIds"))
+        retry_info = RetryInfo()
+        results = {
+            note_id: result or note_id
+            async for note_id, result in client.delete_notes_bulk(
+                note_ids, retry_info=retry_info
+            )
+        }
+        apply_deletes(
+            note_id for note_id, result in results.items() if result == note_id
+        )
+        data = batch_result(note_ids, results)
+        return _build_response(
+            {"deleted": data["notes"], "errors": data["errors"]}, retry_info
+        )
+
+    def update_patch(input_data: dict[str, Any], note: Any) -> dict[str, Any]:
+        """Note metadata to merge into the cache after an update."""
+        patch: dict[str, Any] = {"id": input_data["noteId"], **(note or {})}
+        for key in ("readPermission", "writePermission"):
+            if input_data.get(key):
+                patch[key] = input_data[key]
+        return patch
+
+    def apply_writes(writes: Iterable[tuple[dict[str, Any], str]]) -> None:
+        """Patch the note list cache and content index after writes."""
+        notes = []
+        for note, content in writes:
+            if note.get("id"):
+                notes.append(note)
+                # Without lastChangedAt the note is re-fetched on the next sync
+                content_index.add(note["id"], content, note.get("lastChangedAt"))
+        notes_cache.patch(upserts=notes)
+
+    def apply_deletes(note_ids: Iterable[str]) -> None:
+        """Drop deleted notes from the note list cache and content index."""
+        note_ids = list(note_ids)
+        for note_id in note_ids:
+            content_index.remove(note_id)
+        notes_cache.patch(removed=note_ids)
+
     async def search_notes(input_data: Any) -> str:
         """Search notes by title (and optionally content) with relevance ranking."""
         if not isinstance(input_data, dict):
@@ -95,65 +315,74 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
                 return (90, len(title))
             if keyword_lower in title:
                 return (70, len(title))
-            words = keyword_lower.split()
-            if any(w in title for w in words):
+            if any(token in title for token in tokenize(keyword_lower)):
                 return (60, len(title))
             return (0, len(title))
 
-        def fuzzy_match(text: str) -> bool:
-            text_lower = text.lower()
-            keyword_lower = keyword.lower()
-            if keyword_lower in text_lower:
-                return True
-            key_chars = set(keyword_lower.replace(" ", ""))
-            text_chars = set(text_lower.replace(" ", ""))
-            if not key_chars:
-                return False
-            return len(key_chars & text_chars) / len(key_chars) >= 0.6
+        retry_info = RetryInfo()
+        notes = await notes_cache.get(retry_info=retry_info)
 
+        content_matches: set[str] = set()
         if search_content:
-            notes, retry_info = await client.search_notes(keyword, search_content=True)
-        else:
-            retry_info = RetryInfo()
-            notes = await client.get_note_list(retry_info=retry_info)
-
-        keyword_lower = keyword.lower()
+            await content_index.sync(client, notes, retry_info=retry_info)
+            content_matches = content_index.search(keyword)
 
-        if fuzzy:
-            matched = [
-                (note, calculate_relevance(note))
-                for note in notes
-                if fuzzy_match(note.get("title", ""))
-            ]
-        else:
-            matched = [
-                (note, calculate_relevance(note))
-                for note in notes
-                if keyword_lower in note.get("title", "").lower()
-            ]
+        title_index.sync(notes)
+        matched = [
+            (note, calculate_relevance(note))
+            for note in title_index.matches(keyword, fuzzy, content_matches)
+        ]
 
         matched.sort(key=lambda x: (-x[1][0], x[1][1]))
-        return _build_response([note for note, _ in matched[:limit]], retry_info)
+        return _build_response(
+            [note for note, _ in matched[:limit]], retry_info, NOTE_LIST_FIELDS
+        )
 
-    def _build_response(data: Any, retry_info: RetryInfo) -> str:
+    def _build_response(
+        data: Any,
+        retry_info: RetryInfo,
+        fields: tuple[str, ...] | None = None,
+        extra_meta: dict[str, Any] | None = None,
+    ) -> str:
         """Build JSON response with retry metadata for AI agent transparency."""
-        result = {
-            "data": data,
-            "_meta": {
-                "retry_info": {
-                    "was_rate_limited": retry_info.attempted,
-                    "total_attempts": retry_info.total_attempts,
-                    "total_wait_seconds": round(retry_info.final_wait_total, 2),
-                },
-            },
-        }
-        return json.dumps(result, indent=2, ensure_ascii=False)
+        return build_response(
+            data, retry_info, compact=compact, fields=fields, extra_meta=extra_meta
+        )
 
     return [
         Tool(
             name="hackmd_list_notes",
-            description="List all notes from HackMD.",
-            input_schema={"type": "object", "properties": {}},
+            description=(
+                "List notes from HackMD. Use offset/limit to page through large "
+                "note lists and fields to return only the metadata you need."
+            ),
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of notes to skip (default: 0)",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Max notes to return (default: all)",
+                    },
+                    "fields": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Note fields to return, e.g. title, tags "
+                        "(id is always included)",
+                    },
+                    "sort": {
+                        "type": "string",
+                        "enum": [
+                            *NOTE_SORT_KEYS,
+                            *(f"-{key}" for key in NOTE_SORT_KEYS),
+                        ],
+                        "description": "Sort key; prefix with - for descending",
+                    },
+                },
+            },
             call=list_notes,
         ),
         Tool(
@@ -171,6 +400,67 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
             },
             call=read_note,
         ),
+        Tool(
+            name="hackmd_note_outline",
+            description=(
+                "Get a note's heading outline with the size of each section. "
+                "Use it with hackmd_read_section to read long notes piece by piece."
+            ),
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "noteId": {
+                        "type": "string",
+                        "description": "The unique ID of the note",
+                    },
+                },
+                "required": ["noteId"],
+            },
+            call=note_outline_tool,
+        ),
+        Tool(
+            name="hackmd_read_section",
+            description="Read only the section of a note under a given heading.",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "noteId": {
+                        "type": "string",
+                        "description": "The unique ID of the note",
+                    },
+                    "heading": {
+                        "type": "string",
+                        "description": "Heading title as shown in the outline",
+                    },
+                    "includeSubsections": {
+                        "type": "boolean",
+                        "description": "Include nested subsections (default: true)",
+                    },
+                },
+                "required": ["noteId", "heading"],
+            },
+            call=read_section,
+        ),
+        Tool(
+            name="hackmd_read_notes",
+            description=(
+                "Read the full content of several notes at once. Returns the "
+                "notes plus an error entry for each note that could not be read."
+            ),
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "noteIds": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "IDs of the notes to read "
+                        f"(at most {MAX_BATCH_SIZE})",
+                    },
+                },
+                "required": ["noteIds"],
+            },
+            call=read_notes,
+        ),
         Tool(
             name="hackmd_create_note",
             description="Create a new note on HackMD.",
@@ -244,6 +534,94 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
             },
             call=delete_note,
         ),
+        Tool(
+            name="hackmd_create_notes",
+            description=(
+                "Create several notes at once. Returns the created notes plus "
+                "an error entry (with the note's index) for each failed note."
+            ),
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "notes": {
+                        "type": "array",
+                        "description": f"Notes to create (at most {MAX_BATCH_SIZE})",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string"},
+                                "content": {"type": "string"},
+                                "readPermission": {
+                                    "type": "string",
+                                    "enum": ["owner", "signed_in", "guest"],
+                                },
+                                "writePermission": {
+                                    "type": "string",
+                                    "enum": ["owner", "signed_in", "guest"],
+                                },
+                            },
+                            "required": ["title", "content"],
+                        },
+                    },
+                },
+                "required": ["notes"],
+            },
+            call=create_notes,
+        ),
+        Tool(
+            name="hackmd_update_notes",
+            description=(
+                "Update the content of several notes at once. Returns the "
+                "updated notes plus an error entry for each failed note."
+            ),
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "notes": {
+                        "type": "array",
+                        "description": f"Updates to apply (at most {MAX_BATCH_SIZE})",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "noteId": {"type": "string"},
+                                "content": {"type": "string"},
+                                "readPermission": {
+                                    "type": "string",
+                                    "enum": ["owner", "signed_in", "guest"],
+                                },
+                                "writePermission": {
+                                    "type": "string",
+                                    "enum": ["owner", "signed_in", "guest"],
+                                },
+                            },
+                            "required": ["noteId", "content"],
+                        },
+                    },
+                },
+                "required": ["notes"],
+            },
+            call=update_notes,
+        ),
+        Tool(
+            name="hackmd_delete_notes",
+            description=(
+                "Permanently delete several notes at once. Returns the deleted "
+                "IDs plus an error entry for each note that could not be deleted."
+            ),
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "noteIds": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "IDs of the notes to delete "
+                        f"(at most {MAX_BATCH_SIZE})",
+                    },
+                },
+                "required": ["noteIds"],
+            },
+            call=delete_notes,
+        ),
         Tool(
             name="hackmd_search_notes",
             description="Search notes by title with relevance ranking.",
@@ -256,7 +634,11 @@ def create_hackmd_tools(api_token: str, base_url: str | None = None) -> list[Too
                     },
                     "searchContent": {
                         "type": "boolean",
-                        "description": "Search within note content (slower)",
+                        "description": (
+                            "Also search note content. Matches whole words; "
+                            "the last word may be a prefix (e.g. 'hack' finds "
+                            "'hackmd')"
+                        ),
                     },
                     "fuzzy": {
                         "type": "boolean",
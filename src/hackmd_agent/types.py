@@ -1,8 +1,10 @@
 """Type definitions and utilities for AI agent tools."""
 
 import json
-from collections.abc import Awaitable, Callable
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any, TypedDict
 
 
@@ -27,7 +29,100 @@ class Tool:
     call: Callable[[Any], Awaitable[str]]
 
 
-def to_gemini_tools(tools: list[Tool]) -> list[dict[str, Any]]:
+@dataclass
+class ToolStats:
+    """Call counters and latency of a single tool."""
+
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class ToolRegistry:
+    """
+    Immutable snapshot of tools indexed by name.
+    Dispatches calls in constant time and records per-tool statistics.
+    Iterating a registry yields its Tool objects in registration order.
+    """
+
+    def __init__(self, tools: Iterable[Tool] = ()) -> None:
+        by_name: dict[str, Tool] = {}
+        for tool in tools:
+            if tool.name in by_name:
+                raise ValueError(f"Duplicate tool name: {tool.name}")
+            by_name[tool.name] = tool
+        self._tools = MappingProxyType(by_name)
+        self._stats = {name: ToolStats() for name in by_name}
+
+    def __iter__(self) -> Iterator[Tool]:
+        return iter(self._tools.values())
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._tools
+
+    def __getitem__(self, name: str) -> Tool:
+        return self._tools[name]
+
+    def get(self, name: str) -> Tool | None:
+        """Return the tool with the given name, if registered."""
+        return self._tools.get(name)
+
+    def names(self) -> list[str]:
+        """Return the registered tool names."""
+        return list(self._tools)
+
+    def with_tools(self, *tools: Tool) -> "ToolRegistry":
+        """Return a new registry with additional tools.
+
+        Statistics of tools already registered carry over.
+        """
+        registry = ToolRegistry([*self, *tools])
+        for name, stats in self._stats.items():
+            registry._stats[name] = stats
+        return registry
+
+    def stats(self) -> dict[str, ToolStats]:
+        """Return a copy of the per-tool statistics."""
+        return {
+            name: ToolStats(s.calls, s.errors, s.total_seconds, s.max_seconds)
+            for name, s in self._stats.items()
+        }
+
+    async def execute(self, name: str, input_data: Any) -> str:
+        """Execute a tool by name, returning a JSON error if it fails."""
+        tool = self._tools.get(name)
+        if not tool:
+            return json.dumps({"error": "Tool not found", "name": name})
+        stats = self._stats[name]
+        start = time.perf_counter()
+        try:
+            return await tool.call(input_data)
+        except Exception as e:
+            stats.errors += 1
+            return json.dumps({"error": str(e)})
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+
+
+def as_registry(tools: "ToolRegistry | Iterable[Tool]") -> ToolRegistry:
+    """Return ``tools`` as a ToolRegistry, building one from a list if needed."""
+    if isinstance(tools, ToolRegistry):
+        return tools
+    return ToolRegistry(tools)
+
+
+def to_gemini_tools(tools: Iterable[Tool]) -> list[dict[str, Any]]:
     """
     Convert Tool list to Gemini function declarations format.
     Returns a list of FunctionDeclaration-compatible dicts for google-genai SDK.
@@ -47,7 +142,7 @@ def to_gemini_tools(tools: list[Tool]) -> list[dict[str, Any]]:
 
 
 # Keep backward compatibility alias
-def to_anthropic_tools(tools: list[Tool]) -> list[dict[str, Any]]:
+def to_anthropic_tools(tools: Iterable[Tool]) -> list[dict[str, Any]]:
     """
     Convert Tool list to Anthropic tool format.
     Deprecated: Use to_gemini_tools() instead.
@@ -63,15 +158,13 @@ def to_anthropic_tools(tools: list[Tool]) -> list[dict[str, Any]]:
 
 
 async def execute_tool(
-    tools: list[Tool],
+    tools: ToolRegistry | list[Tool],
     name: str,
     input_data: Any,
 ) -> str:
-    """Find and execute a tool by name."""
-    tool = next((t for t in tools if t.name == name), None)
-    if not tool:
-        return json.dumps({"error": "Tool not found", "name": name})
-    try:
-        return await tool.call(input_data)
-    except Exception as e:
-        return json.dumps({"error": str(e)})
+    """Find and execute a tool by name.
+
+    Pass a ToolRegistry for constant-time lookup and call statistics;
+    a plain list is wrapped in a temporary registry.
+    """
+    return await as_registry(tools).execute(name, input_data)
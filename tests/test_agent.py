@@ -0,0 +1,210 @@
+"""Tests for agent module."""
+
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.genai import types
+
+from hackmd_agent.agent import (
+    Agent,
+    AgentConfig,
+    _create_tools_config,
+    process_message,
+    read_input,
+    stream_message,
+)
+from hackmd_agent.types import Tool
+
+
+class FakeChat:
+    """Chat session that replays scripted model responses."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    async def send_message(self, message):
+        self.sent.append(message)
+        return self.responses.pop(0)
+
+    async def send_message_stream(self, message):
+        self.sent.append(message)
+        chunks = self.responses.pop(0)
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        return stream()
+
+
+def _response(text=None, function_calls=None):
+    return SimpleNamespace(text=text, function_calls=function_calls)
+
+
+def _make_client(chat):
+    client = MagicMock()
+    client.aio.chats.create.return_value = chat
+    return client
+
+
+@pytest.mark.asyncio
+async def test_process_message_executes_all_calls_in_one_turn():
+    """All function calls of a turn run concurrently and reply together."""
+    running = 0
+    peak = 0
+
+    async def read_note(input_data: dict) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return json.dumps({"id": input_data["noteId"]})
+
+    tools = [
+        Tool(
+            name="hackmd_read_note",
+            description="Read",
+            input_schema={"type": "object"},
+            call=read_note,
+        )
+    ]
+    calls = [
+        types.FunctionCall(name="hackmd_read_note", args={"noteId": f"n{i}"})
+        for i in range(5)
+    ]
+    chat = FakeChat([_response(function_calls=calls), _response(text="Done")])
+
+    result = await process_message(
+        _make_client(chat),
+        tools,
+        "Summarize my notes",
+        config=AgentConfig(max_concurrent_tools=3),
+    )
+
+    assert result.response == "Done"
+    assert result.tools_used == ["hackmd_read_note"] * 5
+    assert peak == 3
+    # One initial message plus a single message carrying all five results
+    assert len(chat.sent) == 2
+    parts = chat.sent[1]
+    assert len(parts) == 5
+    assert [
+        json.loads(p.function_response.response["result"])["id"] for p in parts
+    ] == [f"n{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_agent_reuses_compiled_config():
+    """Tool declarations are compiled once and rebuilt when tools change."""
+
+    async def noop(_: dict) -> str:
+        return "{}"
+
+    tools = [
+        Tool(name="a", description="A", input_schema={"type": "object"}, call=noop)
+    ]
+    chat = FakeChat([_response(text="one"), _response(text="two")])
+    agent = Agent(_make_client(chat), tools)
+
+    with patch(
+        "hackmd_agent.agent._create_tools_config", wraps=_create_tools_config
+    ) as compile_tools:
+        await agent.process_message("first")
+        await agent.process_message("second")
+        assert compile_tools.call_count == 1
+
+        agent.tools = agent.tools.with_tools(
+            Tool(name="b", description="B", input_schema={"type": "object"}, call=noop)
+        )
+        config = agent.generate_config()
+        assert compile_tools.call_count == 2
+
+    declarations = config.tools[0].function_declarations
+    assert [d.name for d in declarations] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_stream_message_yields_chunks_around_tool_calls():
+    """Text streams as it arrives and function calls run between turns."""
+
+    async def list_notes(_: dict) -> str:
+        return json.dumps([{"id": "n1"}])
+
+    tools = [
+        Tool(
+            name="hackmd_list_notes",
+            description="List",
+            input_schema={"type": "object"},
+            call=list_notes,
+        )
+    ]
+    call = types.FunctionCall(name="hackmd_list_notes", args={})
+    chat = FakeChat(
+        [
+            [_response(text="Let me "), _response(text="check. ")],
+            [_response(text="Checking your notes... ", function_calls=[call])],
+            [_response(text="You have "), _response(text="1 note.")],
+        ]
+    )
+    # The first turn ends without calls, so only the first script entry is used
+    chunks = [c async for c in stream_message(_make_client(chat), tools, "Hi")]
+    assert chunks == ["Let me ", "check. "]
+
+    used = []
+    agent = Agent(_make_client(chat), tools)
+    chunks = [c async for c in agent.stream_message("List", on_tool_call=used.append)]
+    assert chunks == ["Checking your notes... ", "You have ", "1 note."]
+    assert used == ["hackmd_list_notes"]
+    assert json.loads(chat.sent[2][0].function_response.response["result"]) == [
+        {"id": "n1"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_input_does_not_block_event_loop(monkeypatch):
+    """Other tasks keep running while waiting for user input."""
+    release = threading.Event()
+
+    def slow_input(prompt):
+        release.wait(1)
+        return "hello"
+
+    monkeypatch.setattr("builtins.input", slow_input)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.001)
+            ticks += 1
+        release.set()
+
+    line, _ = await asyncio.gather(read_input("> "), ticker())
+    assert line == "hello"
+    assert ticks == 5
+
+
+@pytest.mark.asyncio
+async def test_read_input_propagates_eof(monkeypatch):
+    def eof(prompt):
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", eof)
+    with pytest.raises(EOFError):
+        await read_input()
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_cancellation():
+    """Cancelling the chat loop cancels its task instead of ending quietly."""
+    agent = Agent(_make_client(FakeChat([])), [])
+
+    with patch("hackmd_agent.agent.read_input", side_effect=asyncio.CancelledError):
+        with pytest.raises(asyncio.CancelledError):
+            await agent.run()
@@ -0,0 +1,276 @@
+"""Tests for HackMD data caches."""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from hackmd_agent.cache import NoteContentCache, NoteListCache
+from hackmd_agent.hackmd_client import RetryInfo
+from hackmd_agent.rate_limit import CircuitOpenError
+
+
+class CountingFetcher:
+    """Note list fetcher that counts calls and can be slowed down."""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self, retry_info, progress_callback):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [{"id": "note1", "title": f"Version {self.calls}"}]
+
+
+@pytest.mark.asyncio
+async def test_fresh_list_is_served_from_cache():
+    """Within the soft TTL the list is not refetched."""
+    fetch = CountingFetcher()
+    cache = NoteListCache(fetch, soft_ttl=60, hard_ttl=600)
+
+    first = await cache.get()
+    second = await cache.get()
+
+    assert first is second
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_list_is_served_while_refreshing():
+    """Past the soft TTL the stale list is returned immediately."""
+    fetch = CountingFetcher(delay=0.05)
+    cache = NoteListCache(fetch, soft_ttl=0, hard_ttl=600)
+    await cache.get()
+
+    stale = await cache.get()
+    also_stale = await cache.get()
+    assert stale[0]["title"] == "Version 1"
+    assert also_stale[0]["title"] == "Version 1"
+
+    await asyncio.sleep(0.1)
+    # Only one background refresh was started for both stale reads
+    assert fetch.calls == 2
+    assert cache._notes[0]["title"] == "Version 2"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_reads_share_one_fetch():
+    """Callers waiting on an empty cache share a single request."""
+    fetch = CountingFetcher(delay=0.05)
+    cache = NoteListCache(fetch)
+
+    results = await asyncio.gather(*(cache.get() for _ in range(5)))
+
+    assert fetch.calls == 1
+    assert all(r is results[0] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_refetch():
+    """After invalidation callers wait for fresh data."""
+    fetch = CountingFetcher()
+    cache = NoteListCache(fetch)
+    await cache.get()
+
+    cache.invalidate()
+    notes = await cache.get()
+
+    assert notes[0]["title"] == "Version 2"
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_failure_keeps_stale_list():
+    """A failed background refresh leaves the stale list in place."""
+    fetch = CountingFetcher()
+    cache = NoteListCache(fetch, soft_ttl=0, hard_ttl=600)
+    await cache.get()
+
+    async def failing(retry_info, progress_callback):
+        raise RuntimeError("API down")
+
+    cache._fetch = failing
+    notes = await cache.get()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert notes[0]["title"] == "Version 1"
+    assert isinstance(cache.last_error, RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_upsert_and_remove_patch_cached_list():
+    """Writes patch the cached list without refetching it."""
+    fetch = CountingFetcher()
+    cache = NoteListCache(fetch)
+    original = await cache.get()
+
+    cache.upsert({"id": "note2", "title": "New", "content": "body"})
+    cache.upsert({"id": "note1", "title": "Renamed"})
+    notes = await cache.get()
+
+    assert notes is not original
+    assert [(n["id"], n["title"]) for n in notes] == [
+        ("note2", "New"),
+        ("note1", "Renamed"),
+    ]
+    assert "content" not in notes[0]
+
+    cache.remove("note2")
+    assert [n["id"] for n in await cache.get()] == ["note1"]
+    assert fetch.calls == 1
+
+
+def _note(note_id: str, changed_at: int, content: str = "x" * 100) -> dict:
+    return {"id": note_id, "content": content, "lastChangedAt": changed_at}
+
+
+def test_content_cache_validates_against_list_metadata():
+    """Entries are dropped once the list reports a newer change time."""
+    cache = NoteContentCache()
+    cache.put(_note("a", 1))
+    cache.observe_list([{"id": "a", "lastChangedAt": 1}])
+    assert cache.get("a")["lastChangedAt"] == 1
+
+    cache.observe_list([{"id": "a", "lastChangedAt": 2}])
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_content_cache_evicts_by_size():
+    """Least recently used notes are evicted to stay within the byte budget."""
+    size = len(json.dumps(_note("a", 1), ensure_ascii=False).encode())
+    cache = NoteContentCache(max_bytes=size * 2)
+    cache.put(_note("a", 1))
+    cache.put(_note("b", 1))
+    cache.get("a")
+    cache.put(_note("c", 1))
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.size_bytes <= size * 2
+
+
+def test_content_cache_ttl_without_list_metadata():
+    """Notes never seen in a list are only trusted for the TTL."""
+    cache = NoteContentCache(ttl=0)
+    cache.put({"id": "a", "content": "body"})
+    assert cache.get("a") is None
+
+
+def test_content_cache_ttl_applies_to_notes_with_change_time():
+    """A note's own lastChangedAt does not extend its TTL; a recent list does."""
+    cache = NoteContentCache(ttl=0.05)
+    cache.put(_note("a", 1))
+    assert cache.get("a") is not None
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+    cache.observe_list([{"id": "a", "lastChangedAt": 1}])
+    assert cache.get("a") is not None
+
+
+def test_content_cache_never_lowers_known_change_time():
+    """An older copy of a note cannot replace a newer known change time."""
+    cache = NoteContentCache()
+    cache.put(_note("a", 2, "new"))
+    cache.put(_note("a", 1, "old"))
+    assert cache.get("a") is None
+
+    cache.observe_list([{"id": "a", "lastChangedAt": 1}])
+    assert cache.get("a") is None
+    assert not cache.is_unchanged("a", "old")
+
+
+def test_content_digest_detects_no_op_writes():
+    """Digests survive eviction and are invalidated by newer list metadata."""
+    cache = NoteContentCache(max_bytes=10)
+    cache.put(
+        {
+            "id": "n1",
+            "content": "large body that does not fit",
+            "lastChangedAt": 1,
+            "readPermission": "owner",
+        }
+    )
+
+    assert "n1" not in cache
+    assert cache.is_unchanged("n1", "large body that does not fit")
+    assert cache.is_unchanged("n1", "large body that does not fit", "owner")
+    assert not cache.is_unchanged("n1", "large body that does not fit", "guest")
+    assert not cache.is_unchanged("n1", "edited body")
+    assert not cache.is_unchanged("unknown", "anything")
+
+    cache.observe_list([{"id": "n1", "lastChangedAt": 2}])
+    assert not cache.is_unchanged("n1", "large body that does not fit")
+
+
+@pytest.mark.asyncio
+async def test_expired_list_is_served_while_circuit_is_open():
+    """Past the hard TTL an open circuit returns the old list as stale."""
+    calls = 0
+
+    async def fetch(retry_info, progress_callback):
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            raise CircuitOpenError("read", 30)
+        return [{"id": "a"}]
+
+    cache = NoteListCache(fetch, soft_ttl=0, hard_ttl=0)
+    await cache.get()
+
+    retry_info = RetryInfo()
+    assert await cache.get(retry_info=retry_info) == [{"id": "a"}]
+    assert retry_info.stale
+
+    cache.invalidate()
+    with pytest.raises(CircuitOpenError):
+        await cache.get()
+
+
+@pytest.mark.asyncio
+async def test_stale_refreshes_mark_every_reader():
+    """Lists served during an outage are flagged for every caller."""
+    down = False
+
+    async def fetch(retry_info, progress_callback):
+        if down:
+            # The client falls back to the body stored for revalidation
+            retry_info.stale = True
+            return [{"id": "outage"}]
+        return [{"id": "a"}]
+
+    cache = NoteListCache(fetch, soft_ttl=0, hard_ttl=0)
+    await cache.get()
+    down = True
+
+    infos = [RetryInfo(), RetryInfo()]
+    for info in infos:
+        assert await cache.get(retry_info=info) == [{"id": "outage"}]
+    assert all(info.stale for info in infos)
+    # The pre-outage list is kept and not treated as freshly fetched
+    assert cache._notes == [{"id": "a"}]
+    assert cache.age > 0
+
+    # A background refresh that hits the outage flags later readers too
+    cache.hard_ttl = 600
+    await cache.get()
+    await asyncio.sleep(0)
+    retry_info = RetryInfo()
+    assert await cache.get(retry_info=retry_info) == [{"id": "a"}]
+    assert retry_info.stale
+
+    down = False
+    await cache.get(retry_info=RetryInfo())
+    await asyncio.sleep(0)
+    retry_info = RetryInfo()
+    await cache.get(retry_info=retry_info)
+    assert not retry_info.stale
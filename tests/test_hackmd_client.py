@@ -0,0 +1,518 @@
+"""Tests for HackMD API client."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from hackmd_agent.hackmd_client import HackMDClient, RetryInfo
+from hackmd_agent.rate_limit import CircuitOpenError
+
+NOTES = {
+    f"note{i}": {
+        "id": f"note{i}",
+        "title": f"Note {i}",
+        "content": "needle" if i % 3 == 0 else "hay",
+    }
+    for i in range(10)
+}
+
+
+def make_client(handler, **kwargs):
+    """Create a client whose requests are served by ``handler``."""
+    return HackMDClient(
+        "test-token",
+        base_delay=0.01,
+        transport=httpx.MockTransport(handler),
+        **kwargs,
+    )
+
+
+def note_handler(request: httpx.Request) -> httpx.Response:
+    path = request.url.path.removeprefix("/v1")
+    if path == "/notes":
+        listed = [
+            {k: v for k, v in note.items() if k != "content"} for note in NOTES.values()
+        ]
+        return httpx.Response(200, json=listed)
+    note_id = path.removeprefix("/notes/")
+    if note_id in NOTES:
+        return httpx.Response(200, json=NOTES[note_id])
+    return httpx.Response(404, json={"error": "not found"})
+
+
+@pytest.mark.asyncio
+async def test_get_notes_bulk_yields_all_results():
+    """Bulk fetch yields every note and reports failures as exceptions."""
+    async with make_client(note_handler) as client:
+        results = {
+            note_id: note
+            async for note_id, note in client.get_notes_bulk(
+                ["note1", "note2", "missing"], concurrency=2
+            )
+        }
+
+    assert results["note1"]["content"] == "hay"
+    assert results["note2"]["id"] == "note2"
+    assert isinstance(results["missing"], httpx.HTTPStatusError)
+
+
+@pytest.mark.asyncio
+async def test_get_notes_bulk_respects_concurrency():
+    """No more than ``concurrency`` requests are in flight at once."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return note_handler(request)
+
+    async with make_client(handler) as client:
+        ids = [f"note{i}" for i in range(10)]
+        results = [r async for r in client.get_notes_bulk(ids, concurrency=3)]
+
+    assert len(results) == 10
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_backoff_is_shared():
+    """A 429 on one request pauses requests issued by other callers."""
+    limited = {"done": False}
+    sent_at: dict[str, float] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if not limited["done"]:
+            limited["done"] = True
+            return httpx.Response(429, headers={"Retry-After": "0.2"})
+        sent_at[request.url.path] = asyncio.get_running_loop().time()
+        return note_handler(request)
+
+    async with make_client(handler) as client:
+        start = asyncio.get_running_loop().time()
+        retry_info = RetryInfo()
+        first = asyncio.create_task(client.get_note("note1", retry_info=retry_info))
+        await asyncio.sleep(0.05)
+        second = await client.get_note("note2")
+        await first
+
+    assert second["id"] == "note2"
+    assert retry_info.attempted is True
+    assert sent_at["/v1/notes/note2"] - start >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_search_notes_content():
+    """Content search matches titles and fetched note bodies."""
+    async with make_client(note_handler) as client:
+        notes, _ = await client.search_notes("needle", search_content=True)
+
+    assert [n["id"] for n in notes] == ["note0", "note3", "note6", "note9"]
+
+
+@pytest.mark.asyncio
+async def test_get_note_uses_content_cache():
+    """Repeated reads are served from cache until the note changes."""
+    requests: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return note_handler(request)
+
+    async with make_client(handler) as client:
+        await client.get_note("note1")
+        await client.get_note("note1")
+        assert requests == ["/v1/notes/note1"]
+
+        await client.update_note("note1", "new content")
+        await client.get_note("note1")
+
+    assert requests.count("/v1/notes/note1") == 3
+    assert client.content_cache.stats().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_report_per_item_results():
+    """Bulk create/update/delete run concurrently and key results per item."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        note_id = request.url.path.rsplit("/", 1)[-1]
+        if request.method == "POST":
+            title = json.loads(request.content)["title"]
+            return httpx.Response(201, json={"id": f"new-{title}", "title": title})
+        if note_id == "missing":
+            return httpx.Response(404, json={"error": "not found"})
+        if request.method == "PATCH":
+            return httpx.Response(202, json={"id": note_id})
+        return httpx.Response(204)
+
+    async with make_client(handler) as client:
+        created = {
+            index: note
+            async for index, note in client.create_notes_bulk(
+                [{"title": f"t{i}", "content": "c"} for i in range(6)],
+                concurrency=2,
+            )
+        }
+        updated = {
+            note_id: note
+            async for note_id, note in client.update_notes_bulk(
+                [
+                    {"note_id": "note1", "content": "x"},
+                    {"note_id": "missing", "content": "x"},
+                ]
+            )
+        }
+        deleted = {
+            note_id: result
+            async for note_id, result in client.delete_notes_bulk(["note2", "missing"])
+        }
+
+    assert peak == 2
+    assert created == {i: {"id": f"new-t{i}", "title": f"t{i}"} for i in range(6)}
+    assert updated["note1"] == {"id": "note1"}
+    assert isinstance(updated["missing"], httpx.HTTPStatusError)
+    assert deleted["note2"] is None
+    assert isinstance(deleted["missing"], httpx.HTTPStatusError)
+
+
+@pytest.mark.asyncio
+async def test_update_with_unchanged_content_is_skipped():
+    """Rewriting the content last read or written sends no request."""
+    patches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "PATCH":
+            patches.append(json.loads(request.content)["content"])
+            return httpx.Response(202, json={"id": "note1", "lastChangedAt": 2})
+        return note_handler(request)
+
+    async with make_client(handler) as client:
+        await client.get_note("note1")
+        retry_info = RetryInfo()
+        note = await client.update_note("note1", "hay", retry_info=retry_info)
+        assert retry_info.skipped
+        assert note["id"] == "note1"
+
+        await client.update_note("note1", "edited")
+        retry_info = RetryInfo()
+        await client.update_note("note1", "edited", retry_info=retry_info)
+        assert retry_info.skipped
+
+        updated = [
+            result
+            async for _, result in client.update_notes_bulk(
+                [{"note_id": "note1", "content": "edited"}]
+            )
+        ]
+        assert updated == [{"id": "note1", "skipped": True}]
+
+        await client.update_note("note1", "edited", read_permission="guest")
+
+    assert patches == ["edited", "edited"]
+
+
+@pytest.mark.asyncio
+async def test_update_rechecks_note_edited_elsewhere():
+    """An older recorded state is re-read before an update is skipped."""
+    server = {"id": "n1", "content": "original", "lastChangedAt": 1}
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal server
+        requests.append(request.method)
+        if request.method == "PATCH":
+            content = json.loads(request.content)["content"]
+            server = {"id": "n1", "content": content, "lastChangedAt": 3}
+            return httpx.Response(202, json={"lastChangedAt": 3})
+        return httpx.Response(200, json=server)
+
+    async with make_client(handler) as client:
+        client.NO_OP_MAX_AGE = 0
+        await client.get_note("n1")
+        server = {"id": "n1", "content": "edited elsewhere", "lastChangedAt": 2}
+
+        retry_info = RetryInfo()
+        await client.update_note("n1", "original", retry_info=retry_info)
+        assert not retry_info.skipped
+        assert requests == ["GET", "GET", "PATCH"]
+        assert server["content"] == "original"
+
+        # Re-reading an unchanged note confirms the no-op
+        retry_info = RetryInfo()
+        note = await client.update_note("n1", "original", retry_info=retry_info)
+        assert retry_info.skipped
+        assert note == {"id": "n1"}
+        assert requests == ["GET", "GET", "PATCH", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_fetch_adapts_concurrency_to_429s():
+    """429s shrink the adaptive window that bulk fetches run under."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls <= 2:
+            return httpx.Response(429, headers={"Retry-After": "0.01"})
+        return note_handler(request)
+
+    async with make_client(handler, rate_limit=None, max_concurrency=8) as client:
+        window = client.concurrency_limiter.window
+        results = [r async for r in client.get_notes_bulk(list(NOTES))]
+
+        assert len(results) == len(NOTES)
+        stats = client.concurrency_limiter.stats()
+        assert stats.decreases >= 1
+        assert stats.window <= 8
+        assert window == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_share_one_request():
+    """Identical GETs in flight at the same time are sent once."""
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.path))
+        await asyncio.sleep(0.02)
+        if request.url.path.endswith("/notes"):
+            return httpx.Response(200, json=list(NOTES.values()))
+        return note_handler(request)
+
+    async with make_client(handler, content_cache_bytes=0) as client:
+        notes = await asyncio.gather(*(client.get_note("note1") for _ in range(5)))
+        lists = await asyncio.gather(client.get_note_list(), client.get_note_list())
+        # Once the shared request finished, the next call goes out again
+        await client.get_note("note1")
+
+    assert requests == [
+        ("GET", "/v1/notes/note1"),
+        ("GET", "/v1/notes"),
+        ("GET", "/v1/notes/note1"),
+    ]
+    assert all(n == NOTES["note1"] for n in notes)
+    assert notes[0] is not notes[1]
+    assert lists[0] == lists[1]
+    assert client.coalesced_requests == 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_get():
+    """Other callers still get the response when one of them is cancelled."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.02)
+        return note_handler(request)
+
+    async with make_client(handler, content_cache_bytes=0) as client:
+        first = asyncio.create_task(client.get_note("note1"))
+        second = asyncio.create_task(client.get_note("note1"))
+        await asyncio.sleep(0.005)
+        first.cancel()
+
+        assert (await second)["id"] == "note1"
+
+
+@pytest.mark.asyncio
+async def test_note_list_is_revalidated_with_etag():
+    """A 304 answer to If-None-Match is served from the stored body."""
+    conditional = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        conditional.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=list(NOTES.values()), headers={"ETag": '"v1"'})
+
+    async with make_client(handler) as client:
+        first = await client.get_note_list()
+        second = await client.get_note_list()
+
+        assert first == second == list(NOTES.values())
+        assert conditional == [None, '"v1"']
+        stats = client.validator_cache.stats()
+        assert stats.hits == 1
+        assert stats.entries == 1
+
+
+@pytest.mark.asyncio
+async def test_responses_without_validators_are_not_stored():
+    """Without ETag or Last-Modified, requests stay unconditional."""
+    conditional = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        conditional.append(request.headers.get("If-None-Match"))
+        return httpx.Response(200, json=list(NOTES.values()))
+
+    async with make_client(handler) as client:
+        await client.get_note_list()
+        await client.get_note_list()
+
+        assert conditional == [None, None]
+        assert len(client.validator_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_warm_up_ignores_connection_errors():
+    """Pre-warming sends HEAD requests and never raises."""
+    methods = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert "Authorization" not in request.headers
+        methods.append(request.method)
+        if len(methods) > 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(404)
+
+    async with make_client(handler) as client:
+        assert await client.warm_up(connections=3) == 1
+        assert methods == ["HEAD"] * 3
+        assert client.concurrency_limiter.in_flight == 0
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    """Requesting HTTP/2 without h2 installed warns and uses HTTP/1.1."""
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+
+    with pytest.warns(RuntimeWarning, match="h2"):
+        client = HackMDClient("token", http2=True)
+
+    assert client.http2 is False
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_and_serves_stale_notes():
+    """During an outage reads stop retrying and fall back to cached notes."""
+    requests = []
+    down = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if down:
+            return httpx.Response(503)
+        return note_handler(request)
+
+    async with make_client(
+        handler, content_cache_bytes=1024 * 1024, circuit_failure_threshold=2
+    ) as client:
+        client.content_cache.ttl = 0
+        await client.get_note("note1")
+        down = True
+        requests.clear()
+
+        # Two failures open the circuit; the retry after that is not sent
+        with pytest.raises(CircuitOpenError):
+            await client.get_note_list()
+        assert len(requests) == 2
+        assert client.circuit_breakers["read"].state == "open"
+        assert client.circuit_breakers["write"].state == "closed"
+
+        retry_info = RetryInfo()
+        note = await client.get_note("note1", retry_info=retry_info)
+        assert note == NOTES["note1"]
+        assert retry_info.stale
+        with pytest.raises(CircuitOpenError):
+            await client.get_note("note2")
+        assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_note_expires_after_ttl():
+    """An edit made elsewhere is picked up once the cached copy expires."""
+    server = {"id": "n1", "content": "v1", "lastChangedAt": 1}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=server)
+
+    async with make_client(handler) as client:
+        client.content_cache.ttl = 0.05
+        assert (await client.get_note("n1"))["content"] == "v1"
+        server = {"id": "n1", "content": "v2", "lastChangedAt": 2}
+
+        await asyncio.sleep(0.06)
+        assert (await client.get_note("n1"))["content"] == "v2"
+
+
+@pytest.mark.asyncio
+async def test_get_started_before_write_is_not_cached():
+    """A read that overlaps an update does not overwrite the written state."""
+    server = {"id": "n1", "content": "old", "lastChangedAt": 1}
+    release = asyncio.Event()
+    gets = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal server, gets
+        if request.method == "PATCH":
+            server = {"id": "n1", "content": "new", "lastChangedAt": 2}
+            return httpx.Response(202, json={"lastChangedAt": 2})
+        gets += 1
+        body = dict(server)
+        if gets == 1:
+            await release.wait()
+        return httpx.Response(200, json=body)
+
+    async with make_client(handler) as client:
+        pending = asyncio.create_task(client.get_note("n1"))
+        await asyncio.sleep(0.01)
+        await client.update_note("n1", "new")
+        release.set()
+        assert (await pending)["content"] == "old"
+
+        assert (await client.get_note("n1"))["content"] == "new"
+        assert gets == 2
+        assert not client.content_cache.is_unchanged("n1", "old")
+
+
+@pytest.mark.asyncio
+async def test_stale_reads_are_flagged_and_not_cached():
+    """Stored bodies served during an outage reach every caller as stale."""
+    server = {"id": "n1", "content": "v1", "lastChangedAt": 1}
+    down = False
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if down:
+            return httpx.Response(503)
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            200, json=server, headers={"ETag": f'"{server["lastChangedAt"]}"'}
+        )
+
+    async with make_client(
+        handler, circuit_failure_threshold=1, circuit_reset_timeout=0.05
+    ) as client:
+        await client.get_note("n1")
+        # Only the body stored for revalidation is left to fall back on
+        client.content_cache.invalidate("n1")
+        down = True
+        with pytest.raises(CircuitOpenError):
+            await client.get_note_list()
+
+        infos = [RetryInfo(), RetryInfo()]
+        notes = await asyncio.gather(
+            *(client.get_note("n1", retry_info=info) for info in infos)
+        )
+        assert [n["content"] for n in notes] == ["v1", "v1"]
+        assert all(info.stale for info in infos)
+
+        # Once the API is back the stale body is not mistaken for fresh data
+        server = {"id": "n1", "content": "v2", "lastChangedAt": 2}
+        down = False
+        await asyncio.sleep(0.06)
+        retry_info = RetryInfo()
+        note = await client.get_note("n1", retry_info=retry_info)
+        assert note["content"] == "v2"
+        assert not retry_info.stale
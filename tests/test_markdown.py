@@ -0,0 +1,73 @@
+"""Tests for markdown outline parsing."""
+
+from unittest.mock import patch
+
+from hackmd_agent.cache import OutlineCache
+from hackmd_agent.markdown import find_heading, parse_headings
+
+DOC = """---
+title: Weekly
+# not a heading
+---
+# Weekly Sync
+
+Intro
+
+## Agenda ##
+- item
+
+```python
+# code comment, not a heading
+```
+
+### Details
+more
+
+## Action Items
+- todo
+# Appendix
+end
+"""
+
+
+def test_parse_headings_builds_section_ranges():
+    """Sections end at the next heading of the same or a higher level."""
+    headings = parse_headings(DOC)
+
+    assert [(h.level, h.title) for h in headings] == [
+        (1, "Weekly Sync"),
+        (2, "Agenda"),
+        (3, "Details"),
+        (2, "Action Items"),
+        (1, "Appendix"),
+    ]
+    agenda = headings[1]
+    assert DOC[agenda.start : agenda.end].endswith("more\n\n")
+    assert "### Details" in DOC[agenda.start : agenda.end]
+    assert "### Details" not in DOC[agenda.start : agenda.body_end]
+    assert DOC[headings[0].start : headings[0].end].endswith("- todo\n")
+    assert DOC[headings[-1].start :] == "# Appendix\nend\n"
+
+
+def test_find_heading_prefers_exact_matches():
+    headings = parse_headings("# Action\n## Action Items\n## Notes\n")
+
+    assert find_heading(headings, "action items").title == "Action Items"
+    assert find_heading(headings, "## Action").level == 1
+    assert find_heading(headings, "note").title == "Notes"
+    assert find_heading(headings, "missing") is None
+
+
+def test_outline_cache_parses_each_version_once():
+    """Outlines are reused until the note's lastChangedAt changes."""
+    cache = OutlineCache()
+    note = {"id": "n1", "content": "# A\n", "lastChangedAt": 1}
+
+    with patch("hackmd_agent.cache.parse_headings", wraps=parse_headings) as parse:
+        cache.get(note)
+        cache.get(dict(note))
+        assert parse.call_count == 1
+
+        headings = cache.get({**note, "content": "# B\n", "lastChangedAt": 2})
+        assert parse.call_count == 2
+        assert headings[0].title == "B"
@@ -0,0 +1,187 @@
+"""Tests for the MCP server tools."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from hackmd_agent import mcp_server
+from hackmd_agent.cache import NoteListCache
+from hackmd_agent.search_index import ContentIndex, TitleIndex
+
+
+def _fn(tool):
+    """Return the coroutine function behind a registered MCP tool."""
+    return getattr(tool, "fn", tool)
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    """Install a mock client and fresh caches in the MCP server module."""
+    client = MagicMock()
+    client.get_note_list = AsyncMock(
+        return_value=[
+            {"id": "note1", "title": "Test Note 1", "lastChangedAt": 1},
+            {"id": "note2", "title": "Test Note 2", "lastChangedAt": 1},
+        ]
+    )
+    client.create_note = AsyncMock(
+        return_value={
+            "id": "new-note",
+            "title": "New Note",
+            "content": "# New Note",
+            "lastChangedAt": 2,
+        }
+    )
+    client.update_note = AsyncMock(
+        return_value={"id": "note1", "title": "Renamed", "lastChangedAt": 3}
+    )
+    client.delete_note = AsyncMock(return_value=None)
+
+    monkeypatch.setattr(mcp_server, "_client", client)
+    monkeypatch.setattr(mcp_server, "_content_index", ContentIndex())
+    monkeypatch.setattr(mcp_server, "_title_index", TitleIndex())
+    monkeypatch.setattr(
+        mcp_server, "_notes_cache", NoteListCache(mcp_server._fetch_note_list)
+    )
+    return client
+
+
+async def _search(keyword: str) -> list[dict]:
+    result = await _fn(mcp_server.hackmd_search_notes)(keyword)
+    return json.loads(result)["data"]
+
+
+@pytest.mark.asyncio
+async def test_search_uses_cached_list(mock_client):
+    """Repeated title searches reuse the cached note list."""
+    assert [n["id"] for n in await _search("Note 1")] == ["note1"]
+    assert [n["id"] for n in await _search("Note 2")] == ["note2"]
+    assert mock_client.get_note_list.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_patch_cache_instead_of_refetching(mock_client):
+    """Create, update and delete patch the cached list in place."""
+    await _search("Note")
+
+    await _fn(mcp_server.hackmd_create_note)("New Note", "# New Note")
+    created = await _search("New Note")
+    assert [n["id"] for n in created] == ["new-note"]
+    assert "content" not in created[0]
+
+    await _fn(mcp_server.hackmd_update_note)("note1", "# Renamed")
+    assert [n["id"] for n in await _search("Renamed")] == ["note1"]
+
+    await _fn(mcp_server.hackmd_delete_note)("note2")
+    assert await _search("Test Note 2") == []
+
+    assert mock_client.get_note_list.await_count == 1
+    assert mcp_server._content_index.search("renamed") == {"note1"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_keep_their_own_progress(mock_client):
+    """Progress messages are not shared between concurrent tool calls."""
+
+    async def get_note(note_id, retry_info=None, progress_callback=None):
+        progress_callback(f"start {note_id}")
+        await asyncio.sleep(0.01)
+        progress_callback(f"end {note_id}")
+        return {"id": note_id}
+
+    mock_client.get_note = get_note
+    read = _fn(mcp_server.hackmd_read_note)
+
+    results = await asyncio.gather(read("note1"), read("note2"))
+
+    for note_id, result in zip(["note1", "note2"], results):
+        progress = json.loads(result)["_meta"]["progress_messages"]
+        assert progress == [f"start {note_id}", f"end {note_id}"]
+
+
+@pytest.mark.asyncio
+async def test_list_notes_pages_from_cached_list(mock_client):
+    """Paging through notes reuses the cached list."""
+    list_notes = _fn(mcp_server.hackmd_list_notes)
+
+    first = json.loads(await list_notes(limit=1, fields=["title"], sort="-title"))
+    assert first["data"] == [{"id": "note2", "title": "Test Note 2"}]
+    assert first["_meta"]["pagination"]["next_offset"] == 1
+
+    second = json.loads(await list_notes(offset=1, limit=1, sort="-title"))
+    assert [n["id"] for n in second["data"]] == ["note1"]
+    assert second["_meta"]["pagination"]["next_offset"] is None
+
+    assert mock_client.get_note_list.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_read_notes_fetches_in_bulk(mock_client):
+    """hackmd_read_notes fetches all notes through one bulk call."""
+    requested = []
+
+    async def get_notes_bulk(note_ids, retry_info=None, progress_callback=None):
+        requested.append(list(note_ids))
+        for note_id in note_ids:
+            yield note_id, {"id": note_id, "content": "x"}
+
+    mock_client.get_notes_bulk = get_notes_bulk
+
+    result = json.loads(
+        await _fn(mcp_server.hackmd_read_notes)(["note2", "note1", "note2"])
+    )
+
+    assert requested == [["note2", "note1"]]
+    assert [n["id"] for n in result["data"]["notes"]] == ["note2", "note1"]
+    assert result["data"]["errors"] == []
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_patch_cache_once(mock_client, monkeypatch):
+    """Batch writes report per-item results and patch the cache in one pass."""
+
+    async def create_notes_bulk(notes, retry_info=None, progress_callback=None):
+        for index, note in enumerate(notes):
+            if note["title"] == "bad":
+                yield index, ValueError("rejected")
+            else:
+                yield index, {"id": f"new{index}", "title": note["title"]}
+
+    async def delete_notes_bulk(note_ids, retry_info=None, progress_callback=None):
+        for note_id in note_ids:
+            yield note_id, None
+
+    mock_client.create_notes_bulk = create_notes_bulk
+    mock_client.delete_notes_bulk = delete_notes_bulk
+    await _search("Note")
+    patch_calls = []
+    original_patch = mcp_server._notes_cache.patch
+
+    def patch(*args, **kwargs):
+        patch_calls.append(kwargs)
+        original_patch(*args, **kwargs)
+
+    monkeypatch.setattr(mcp_server._notes_cache, "patch", patch)
+
+    created = json.loads(
+        await _fn(mcp_server.hackmd_create_notes)(
+            [
+                {"title": "Batch A", "content": "alpha"},
+                {"title": "bad", "content": "x"},
+                {"title": "Batch B", "content": "beta"},
+            ]
+        )
+    )["data"]
+    deleted = json.loads(await _fn(mcp_server.hackmd_delete_notes)(["note1", "note2"]))[
+        "data"
+    ]
+
+    assert [n["id"] for n in created["notes"]] == ["new0", "new2"]
+    assert created["errors"] == [{"index": 1, "error": "rejected"}]
+    assert deleted == {"deleted": ["note1", "note2"], "errors": []}
+    assert len(patch_calls) == 2
+    assert [n["id"] for n in await _search("Batch")] == ["new0", "new2"]
+    assert await _search("Test Note") == []
+    assert mcp_server._content_index.search("beta") == {"new2"}
@@ -0,0 +1,173 @@
+"""Tests for client-side rate limiting."""
+
+import asyncio
+import time
+
+import pytest
+
+from hackmd_agent.rate_limit import (
+    AdaptiveConcurrency,
+    CircuitBreaker,
+    CircuitOpenError,
+    QuotaExhaustedError,
+    TokenBucket,
+)
+
+
+@pytest.mark.asyncio
+async def test_burst_then_refill():
+    """Requests beyond the burst wait for tokens to refill."""
+    bucket = TokenBucket(rate=20.0, burst=2)
+
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # Two tokens are available immediately, two more take 1/20s each
+    assert 0.08 <= elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_unlimited_bucket_does_not_wait():
+    """A bucket without a rate never delays requests."""
+    bucket = TokenBucket(rate=None)
+    for _ in range(100):
+        assert await bucket.acquire() < 0.01
+
+
+@pytest.mark.asyncio
+async def test_pause_blocks_callers():
+    """pause() delays every subsequent acquire."""
+    bucket = TokenBucket(rate=None)
+    bucket.pause(0.1)
+
+    waited = await bucket.acquire()
+    assert waited >= 0.09
+
+
+def test_learns_rate_from_headers():
+    """Remaining quota spread over the reset window lowers the rate."""
+    bucket = TokenBucket(rate=10.0)
+    bucket.update_from_headers(
+        {"x-ratelimit-userremaining": "30", "x-ratelimit-userreset": "60"}
+    )
+    assert bucket.rate == pytest.approx(0.5)
+
+    bucket.update_from_headers(
+        {"x-ratelimit-userremaining": "1000", "x-ratelimit-userreset": "60"}
+    )
+    assert bucket.rate == 10.0
+
+
+def test_exhausted_quota_pauses_until_reset():
+    """A zero remaining quota pauses requests until the window resets."""
+    bucket = TokenBucket(rate=10.0)
+    bucket.update_from_headers(
+        {"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(time.time() + 5)}
+    )
+    assert bucket.pause(0) > 4
+
+
+@pytest.mark.asyncio
+async def test_long_quota_windows_fail_fast():
+    """Monthly-style quotas neither throttle the rate nor block callers."""
+    bucket = TokenBucket(rate=10.0, max_window=300, max_pause=32)
+    bucket.update_from_headers(
+        {"x-ratelimit-userremaining": "1500", "x-ratelimit-userreset": "1728000"}
+    )
+    assert bucket.rate == 10.0
+
+    bucket.update_from_headers(
+        {"x-ratelimit-userremaining": "0", "x-ratelimit-userreset": "259200"}
+    )
+    assert bucket.pause(0) == 0
+    with pytest.raises(QuotaExhaustedError, match="72 h"):
+        await asyncio.wait_for(bucket.acquire(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_grows_while_healthy():
+    """A fully used window grows by about one per window of successes."""
+    limiter = AdaptiveConcurrency(initial=2, max_limit=4)
+
+    for _ in range(20):
+        started = [await limiter.acquire() for _ in range(limiter.window)]
+        for s in started:
+            limiter.release(s)
+
+    assert limiter.window == 4
+    assert limiter.stats().max_window == 4
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_halves_once_per_burst():
+    """Overload halves the window once for requests sent before the cut."""
+    limiter = AdaptiveConcurrency(initial=8, max_limit=8)
+    started = [await limiter.acquire() for _ in range(8)]
+
+    for s in started:
+        limiter.release(s, overloaded=True)
+
+    assert limiter.window == 4
+    assert limiter.stats().decreases == 1
+
+    limiter.release(await limiter.acquire(), overloaded=True)
+    assert limiter.window == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_blocks_beyond_window():
+    """Callers wait while the window is full and resume on release."""
+    limiter = AdaptiveConcurrency(initial=1, max_limit=1)
+    first = await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    limiter.release(first)
+    await asyncio.wait_for(waiter, 1)
+    assert limiter.in_flight == 1
+
+
+def test_circuit_opens_after_consecutive_failures():
+    """Failures open the circuit; one probe after the timeout decides."""
+    breaker = CircuitBreaker("read", failure_threshold=2, reset_timeout=0.05)
+
+    breaker.before_request()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    time.sleep(0.06)
+    breaker.before_request()
+    # Only the probe is let through while half-open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    stats = breaker.stats()
+    assert (stats.trips, stats.rejected) == (2, 2)
+
+
+def test_cancelled_probe_frees_half_open_circuit():
+    """A probe that never got an answer lets the next request probe."""
+    breaker = CircuitBreaker("write", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    breaker.before_request()
+    breaker.cancel()
+    breaker.before_request()
+    assert breaker.state == "half_open"
@@ -0,0 +1,126 @@
+"""Tests for tool result encoding."""
+
+import json
+
+import pytest
+
+from hackmd_agent.hackmd_client import RetryInfo
+from hackmd_agent.response import (
+    MAX_BATCH_SIZE,
+    NOTE_LIST_FIELDS,
+    build_response,
+    page_notes,
+    unique_ids,
+)
+
+NOTES = [
+    {
+        "id": "note1",
+        "title": "Test Note 1",
+        "tags": ["a"],
+        "lastChangedAt": 1,
+        "userPath": "user",
+        "teamPath": None,
+        "readPermission": "owner",
+    }
+]
+
+
+def test_default_is_pretty_and_complete():
+    """The default encoding keeps every field and always includes _meta."""
+    result = build_response(NOTES, RetryInfo(), extra_meta={"progress": None})
+    parsed = json.loads(result)
+
+    assert "\n  " in result
+    assert parsed["data"] == NOTES
+    assert parsed["_meta"]["retry_info"]["total_attempts"] == 1
+    assert parsed["_meta"]["progress"] is None
+
+
+def test_compact_projects_fields_and_omits_empty_meta():
+    """Compact results have no whitespace, projected fields and no idle _meta."""
+    result = build_response(
+        NOTES,
+        RetryInfo(),
+        compact=True,
+        fields=NOTE_LIST_FIELDS,
+        extra_meta={"progress": None},
+    )
+
+    assert result == (
+        '{"data":[{"id":"note1","title":"Test Note 1","tags":["a"],"lastChangedAt":1}]}'
+    )
+    assert len(result) < len(build_response(NOTES, RetryInfo())) / 2
+
+
+def test_compact_keeps_meta_when_something_happened():
+    """Retries and progress messages are still reported in compact mode."""
+    retry_info = RetryInfo(attempted=True, total_attempts=2, final_wait_total=1.5)
+    parsed = json.loads(
+        build_response(
+            {"success": True},
+            retry_info,
+            compact=True,
+            extra_meta={"progress": ["Retrying"]},
+        )
+    )
+
+    assert parsed["_meta"] == {
+        "retry_info": {
+            "was_rate_limited": True,
+            "total_attempts": 2,
+            "total_wait_seconds": 1.5,
+        },
+        "progress": ["Retrying"],
+    }
+
+
+def test_page_notes_sorts_slices_and_projects():
+    """Pages follow the sort order and report where the next page starts."""
+    notes = [
+        {"id": "b", "title": "beta", "lastChangedAt": 2, "tags": []},
+        {"id": "a", "title": "Alpha", "lastChangedAt": 3, "tags": []},
+        {"id": "c", "title": "gamma", "tags": []},
+    ]
+
+    page, pagination = page_notes(notes, limit=2, sort="title", fields=["title"])
+    assert page == [{"id": "a", "title": "Alpha"}, {"id": "b", "title": "beta"}]
+    assert pagination == {"total": 3, "offset": 0, "limit": 2, "next_offset": 2}
+
+    page, pagination = page_notes(notes, offset=2, limit=2, sort="title")
+    assert [n["id"] for n in page] == ["c"]
+    assert pagination["next_offset"] is None
+
+    # Notes without the sort field come last in descending order too
+    page, _ = page_notes(notes, sort="-lastChangedAt")
+    assert [n["id"] for n in page] == ["a", "b", "c"]
+
+
+def test_page_notes_rejects_unknown_sort_key():
+    with pytest.raises(ValueError, match="sort must be one of"):
+        page_notes([], sort="content")
+
+
+def test_unique_ids_validates_batches():
+    assert unique_ids(["a", "b", "a"]) == ["a", "b"]
+    with pytest.raises(ValueError):
+        unique_ids([])
+    with pytest.raises(ValueError):
+        unique_ids(["a"] * (MAX_BATCH_SIZE + 1))
+
+
+def test_skipped_requests_are_reported():
+    """A skipped request shows up as _meta.skipped in both encodings."""
+    retry_info = RetryInfo(skipped=True)
+
+    assert json.loads(build_response({}, retry_info))["_meta"]["skipped"] is True
+    compact = json.loads(build_response({}, retry_info, compact=True))
+    assert compact["_meta"] == {"skipped": True}
+
+
+def test_stale_data_is_reported():
+    """Cached data served during an outage is flagged as _meta.stale."""
+    retry_info = RetryInfo(stale=True)
+
+    compact = json.loads(build_response({}, retry_info, compact=True))
+    assert compact["_meta"] == {"stale": True}
@@ -0,0 +1,185 @@
+"""Tests for the persistent content index."""
+
+import asyncio
+import threading
+
+import pytest
+
+from hackmd_agent.search_index import ContentIndex, TitleIndex
+
+
+class FakeClient:
+    """Minimal client serving note contents to ``ContentIndex.sync``."""
+
+    def __init__(self, contents):
+        self.contents = contents
+        self.fetched = []
+
+    async def get_notes_bulk(self, note_ids, **kwargs):
+        for note_id in note_ids:
+            self.fetched.append(note_id)
+            yield note_id, {"id": note_id, "content": self.contents[note_id]}
+
+
+def test_search_matches_phrases():
+    """Multi-word queries only match terms appearing consecutively."""
+    index = ContentIndex()
+    index.add("a", "The quick brown fox")
+    index.add("b", "brown and quick")
+
+    assert index.search("quick") == {"a", "b"}
+    assert index.search("Quick Brown") == {"a"}
+    assert index.search("missing") == set()
+    assert index.search("") == set()
+
+
+def test_last_query_word_matches_prefixes():
+    """The last word of a query also matches longer indexed words."""
+    index = ContentIndex()
+    index.add("a", "HackMD agent notes")
+    index.add("b", "hacker news")
+
+    assert index.search("hack") == {"a", "b"}
+    assert index.search("note") == {"a"}
+    assert index.search("hackmd ag") == {"a"}
+    # Only the last word is a prefix
+    assert index.search("hack agent") == set()
+    assert index.search("md") == set()
+
+    index.remove("b")
+    assert index.search("hack") == {"a"}
+
+
+def test_remove_note():
+    """Removed notes no longer appear in results."""
+    index = ContentIndex()
+    index.add("a", "hello world")
+    index.remove("a")
+
+    assert index.search("hello") == set()
+    assert "a" not in index
+
+
+def test_save_and_load(tmp_path):
+    """The index survives a round trip through disk."""
+    path = tmp_path / "index.json"
+    index = ContentIndex(path)
+    index.add("a", "persistent search index", changed_at=1)
+    index.save()
+
+    loaded = ContentIndex(path)
+    assert loaded.search("search index") == {"a"}
+    assert loaded.stale_notes([{"id": "a", "lastChangedAt": 1}]) == []
+
+
+@pytest.mark.asyncio
+async def test_sync_fetches_only_changed_notes(tmp_path):
+    """Sync re-fetches changed notes and drops notes no longer listed."""
+    client = FakeClient({"a": "alpha", "b": "beta", "c": "gamma"})
+    index = ContentIndex(tmp_path / "index.json")
+    notes = [
+        {"id": "a", "lastChangedAt": 1},
+        {"id": "b", "lastChangedAt": 1},
+        {"id": "c", "lastChangedAt": 1},
+    ]
+    await index.sync(client, notes)
+    assert sorted(client.fetched) == ["a", "b", "c"]
+
+    client.fetched.clear()
+    client.contents["b"] = "delta"
+    notes = [{"id": "a", "lastChangedAt": 1}, {"id": "b", "lastChangedAt": 2}]
+    await index.sync(client, notes)
+
+    assert client.fetched == ["b"]
+    assert index.search("delta") == {"b"}
+    assert index.search("beta") == set()
+    assert index.search("gamma") == set()
+
+
+@pytest.mark.asyncio
+async def test_writes_during_threaded_save_stay_dirty(tmp_path, monkeypatch):
+    """A note added while sync saves is neither serialized midway nor lost."""
+    path = tmp_path / "index.json"
+    index = ContentIndex(path)
+    client = FakeClient({"a": "alpha"})
+    started = threading.Event()
+    release = threading.Event()
+    write = ContentIndex._write
+
+    def slow_write(path, data):
+        started.set()
+        release.wait(5)
+        write(path, data)
+
+    monkeypatch.setattr(ContentIndex, "_write", staticmethod(slow_write))
+    sync = asyncio.create_task(index.sync(client, [{"id": "a", "lastChangedAt": 1}]))
+    while not started.is_set():
+        await asyncio.sleep(0.01)
+    index.add("late", "written during save", changed_at=1)
+    release.set()
+    await sync
+
+    assert ContentIndex(path).search("written") == set()
+    # The next sync fetches nothing but still saves the late note
+    notes = [{"id": "a", "lastChangedAt": 1}, {"id": "late", "lastChangedAt": 1}]
+    await index.sync(client, notes)
+    assert ContentIndex(path).search("written") == {"late"}
+
+
+def test_search_cjk_substring():
+    """CJK substrings match content without whitespace separation."""
+    index = ContentIndex()
+    index.add("a", "本週專案會議記錄整理")
+    index.add("b", "會員記錄")
+
+    assert index.search("會議記錄") == {"a"}
+    assert index.search("記錄") == {"a", "b"}
+    assert index.search("議") == {"a"}
+
+    # A standalone occurrence elsewhere must not hide the bigram matches
+    index.add("c", "我 會 來")
+    assert index.search("會") == {"a", "b", "c"}
+
+
+def test_title_index_substring_search():
+    """Title search finds substrings via the bigram index."""
+    index = TitleIndex()
+    index.sync(
+        [
+            {"id": "1", "title": "Project Plan"},
+            {"id": "2", "title": "專案會議記錄"},
+            {"id": "3", "title": "會員名單"},
+        ]
+    )
+
+    assert index.search("plan") == {"1"}
+    assert index.search("會議") == {"2"}
+    assert index.search("會") == {"2", "3"}
+    assert index.search("missing") == set()
+
+
+def test_title_index_fuzzy_search():
+    """Fuzzy search tolerates typos without matching unrelated CJK titles."""
+    index = TitleIndex()
+    index.sync(
+        [
+            {"id": "1", "title": "Project Plan"},
+            {"id": "2", "title": "會議記錄"},
+            {"id": "3", "title": "錄音會後記議"},
+        ]
+    )
+
+    assert index.fuzzy_search("projct plan") == {"1"}
+    assert index.fuzzy_search("專案會議記錄") == {"2"}
+
+
+def test_title_index_sync_updates_titles():
+    """Renamed and deleted notes are re-indexed on sync."""
+    index = TitleIndex()
+    index.sync([{"id": "1", "title": "Old"}, {"id": "2", "title": "Other"}])
+    index.sync([{"id": "1", "title": "New"}])
+
+    assert index.search("old") == set()
+    assert index.search("new") == {"1"}
+    assert len(index) == 1
+    assert [n["id"] for n in index.matches("new", extra_ids={"2"})] == ["1"]
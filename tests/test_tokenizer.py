@@ -0,0 +1,37 @@
+"""Tests for the CJK-aware tokenizer."""
+
+from hackmd_agent.tokenizer import char_ngrams, is_cjk, tokenize
+
+
+def test_tokenize_latin_words():
+    """Latin text is split into lowercase words."""
+    assert tokenize("Hello, World! api_v2") == ["hello", "world", "api", "v2"]
+
+
+def test_tokenize_cjk_bigrams():
+    """CJK runs become overlapping bigrams between Latin words."""
+    assert tokenize("HackMD 會議記錄") == ["hackmd", "會議", "議記", "記錄"]
+    assert tokenize("筆記") == ["筆記"]
+    assert tokenize("的") == ["的"]
+
+
+def test_cjk_substring_is_token_subsequence():
+    """A CJK substring yields a contiguous run of the text's tokens."""
+    text = tokenize("每週專案會議記錄")
+    query = tokenize("會議記錄")
+    start = text.index(query[0])
+    assert text[start : start + len(query)] == query
+
+
+def test_char_ngrams():
+    """Character bigrams stay within words."""
+    assert char_ngrams("ab cd") == {"ab", "cd"}
+    assert char_ngrams("會議") == {"會議"}
+
+
+def test_is_cjk():
+    """CJK detection covers Chinese, kana and Hangul."""
+    assert is_cjk("會")
+    assert is_cjk("テ")
+    assert is_cjk("한")
+    assert not is_cjk("a")
@@ -132,3 +132,148 @@ async def test_search_notes(mock_client):
     data = parsed["data"]
     assert len(data) == 1
     assert data[0]["title"] == "Test Note 1"
+
+
+@pytest.mark.asyncio
+async def test_compact_responses(mock_client):
+    """Compact mode drops whitespace, unused fields and an empty _meta."""
+    tools = create_hackmd_tools("test-token", compact=True)
+    tool = next(t for t in tools if t.name == "hackmd_create_note")
+
+    result = await tool.call({"title": "New Note", "content": "# New"})
+
+    assert result == (
+        '{"data":{"id":"new-note","title":"New Note",'
+        '"publishLink":"https://hackmd.io/new-note"}}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_notes_pagination_uses_cache(mock_client):
+    """Paged list calls are served from the cached note list."""
+    tools = create_hackmd_tools("test-token")
+    tool = next(t for t in tools if t.name == "hackmd_list_notes")
+
+    first = json.loads(await tool.call({"limit": 1, "fields": ["title"]}))
+    second = json.loads(await tool.call({"offset": 1, "limit": 1}))
+
+    assert first["data"] == [{"id": "note1", "title": "Test Note 1"}]
+    assert first["_meta"]["pagination"]["next_offset"] == 1
+    assert second["data"][0]["id"] == "note2"
+    assert mock_client.get_note_list.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_read_notes_reports_per_note_errors(mock_client):
+    """Batch reads return notes in request order and errors per note."""
+
+    async def get_notes_bulk(note_ids, retry_info=None, progress_callback=None):
+        for note_id in reversed(note_ids):
+            if note_id == "missing":
+                yield note_id, ValueError("Note not found")
+            else:
+                yield note_id, {"id": note_id, "content": f"# {note_id}"}
+
+    mock_client.get_notes_bulk = get_notes_bulk
+    tools = create_hackmd_tools("test-token")
+    tool = next(t for t in tools if t.name == "hackmd_read_notes")
+
+    result = await tool.call({"noteIds": ["note1", "missing", "note2", "note1"]})
+    data = json.loads(result)["data"]
+
+    assert [n["id"] for n in data["notes"]] == ["note1", "note2"]
+    assert data["errors"] == [{"id": "missing", "error": "Note not found"}]
+
+
+@pytest.mark.asyncio
+async def test_update_notes_reports_failures(mock_client):
+    """Batch updates return updated notes and per-note errors."""
+
+    async def update_notes_bulk(updates, retry_info=None, progress_callback=None):
+        for update in updates:
+            if update["note_id"] == "note2":
+                yield "note2", ValueError("Note not found")
+            else:
+                yield update["note_id"], {"id": update["note_id"], "title": "New"}
+
+    mock_client.update_notes_bulk = update_notes_bulk
+    tools = create_hackmd_tools("test-token")
+    tool = next(t for t in tools if t.name == "hackmd_update_notes")
+
+    result = await tool.call(
+        {
+            "notes": [
+                {"noteId": "note1", "content": "# New"},
+                {"noteId": "note2", "content": "# Other"},
+            ]
+        }
+    )
+    data = json.loads(result)["data"]
+
+    assert data["notes"] == [{"id": "note1", "title": "New"}]
+    assert data["errors"] == [{"id": "note2", "error": "Note not found"}]
+
+    with pytest.raises(ValueError, match="only be updated once"):
+        await tool.call(
+            {
+                "notes": [
+                    {"noteId": "note1", "content": "a"},
+                    {"noteId": "note1", "content": "b"},
+                ]
+            }
+        )
+
+
+@pytest.mark.asyncio
+async def test_update_notes_reports_skipped_without_patching(mock_client):
+    """Skipped batch updates are flagged and leave the index untouched."""
+
+    async def update_notes_bulk(updates, retry_info=None, progress_callback=None):
+        yield "note1", {"id": "note1", "title": "New", "lastChangedAt": 2}
+        yield "note2", {"id": "note2", "skipped": True}
+
+    mock_client.update_notes_bulk = update_notes_bulk
+    with patch("hackmd_agent.tools.ContentIndex") as MockIndex:
+        tools = create_hackmd_tools("test-token")
+        tool = next(t for t in tools if t.name == "hackmd_update_notes")
+        result = await tool.call(
+            {
+                "notes": [
+                    {"noteId": "note1", "content": "# New"},
+                    {"noteId": "note2", "content": "# Same"},
+                ]
+            }
+        )
+
+    data = json.loads(result)["data"]
+    assert data["notes"][1] == {"id": "note2", "skipped": True}
+    MockIndex.return_value.add.assert_called_once_with("note1", "# New", 2)
+
+
+@pytest.mark.asyncio
+async def test_outline_and_section_reads(mock_client):
+    """The outline lists headings and a section read returns only its range."""
+    mock_client.get_note.return_value = {
+        "id": "note1",
+        "title": "Sync",
+        "content": "# Sync\nintro\n## Agenda\n- a\n## Notes\n- n\n",
+    }
+    tools = {t.name: t for t in create_hackmd_tools("test-token")}
+
+    outline = json.loads(await tools["hackmd_note_outline"].call({"noteId": "note1"}))
+    section = json.loads(
+        await tools["hackmd_read_section"].call(
+            {"noteId": "note1", "heading": "agenda"}
+        )
+    )
+
+    assert [h["title"] for h in outline["data"]["outline"]] == [
+        "Sync",
+        "Agenda",
+        "Notes",
+    ]
+    assert section["data"]["content"] == "## Agenda\n- a\n"
+    with pytest.raises(ValueError, match="Heading not found"):
+        await tools["hackmd_read_section"].call(
+            {"noteId": "note1", "heading": "Budget"}
+        )
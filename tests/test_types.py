@@ -1,7 +1,13 @@
 """Tests for types module."""
 
 import pytest
-from hackmd_agent.types import Tool, to_gemini_tools, to_anthropic_tools, execute_tool
+from hackmd_agent.types import (
+    Tool,
+    ToolRegistry,
+    to_gemini_tools,
+    to_anthropic_tools,
+    execute_tool,
+)
 
 
 def test_to_gemini_tools():
@@ -106,3 +112,45 @@ async def test_execute_tool_error():
 
     result = await execute_tool(tools, "error_tool", {})
     assert "Something failed" in result
+
+
+@pytest.mark.asyncio
+async def test_tool_registry_dispatch_and_stats():
+    """Registry dispatches by name and records calls, errors and latency."""
+
+    async def ok_call(_: dict) -> str:
+        return '{"ok": true}'
+
+    async def error_call(_: dict) -> str:
+        raise ValueError("boom")
+
+    registry = ToolRegistry(
+        [
+            Tool(name="ok", description="", input_schema={}, call=ok_call),
+            Tool(name="bad", description="", input_schema={}, call=error_call),
+        ]
+    )
+
+    assert "ok" in registry
+    assert [t.name for t in registry] == ["ok", "bad"]
+    assert await execute_tool(registry, "ok", {}) == '{"ok": true}'
+    assert await execute_tool(registry, "ok", {}) == '{"ok": true}'
+    assert "boom" in await execute_tool(registry, "bad", {})
+
+    stats = registry.stats()
+    assert stats["ok"].calls == 2
+    assert stats["ok"].errors == 0
+    assert stats["bad"].errors == 1
+    assert stats["ok"].total_seconds >= stats["ok"].max_seconds > 0
+    assert to_gemini_tools(registry)[0]["name"] == "ok"
+
+
+def test_tool_registry_rejects_duplicates():
+    """Tool names must be unique within a registry."""
+
+    async def call(_: dict) -> str:
+        return "{}"
+
+    tool = Tool(name="dup", description="", input_schema={}, call=call)
+    with pytest.raises(ValueError, match="Duplicate tool name"):
+        ToolRegistry([tool, tool])